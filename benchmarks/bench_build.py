@@ -0,0 +1,146 @@
+"""End-to-end build benchmark on synthetic vpn_raw.csv catalogs.
+
+Generates catalogs of the requested sizes (reusing the real CSV rows as
+templates so Long_Review sizes stay realistic), builds each one in a fresh
+process so peak RSS is per-build, and appends the results to
+benchmarks/results.jsonl so build time and memory can be compared across
+versions.
+
+Usage:
+    python benchmarks/bench_build.py                     # 50, 5000, 50000 providers
+    python benchmarks/bench_build.py --sizes 50,5000 --jobs 4
+"""
+import os
+import sys
+import csv
+import glob
+import json
+import random
+import shutil
+import argparse
+import subprocess
+import tempfile
+import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, os.path.join(REPO_DIR, 'src'))
+
+RESULTS_PATH = os.path.join(BENCH_DIR, 'results.jsonl')
+DEFAULT_SIZES = "50,5000,50000"
+
+def load_template_rows():
+    with open(os.path.join(REPO_DIR, 'data', 'vpn_raw.csv'), 'r', encoding='utf-8-sig') as f:
+        reader = csv.DictReader(f)
+        return reader.fieldnames, list(reader)
+
+def write_catalog(path, size, seed=42):
+    # 以真实数据行为模板：Provider 唯一化，评测正文打乱段落顺序，长度分布与真实数据一致
+    fieldnames, rows = load_template_rows()
+    rng = random.Random(seed)
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        for i in range(size):
+            # 前 len(rows) 行就是真实数据，之后的行随机选模板并给 Provider 加序号，保证 slug 唯一
+            if i < len(rows):
+                row = dict(rows[i])
+            else:
+                row = dict(rng.choice(rows))
+                row['Provider'] = f"{row['Provider']} {i}"
+            sections = row['Long_Review'].split('<h3>')
+            rng.shuffle(sections)
+            row['Long_Review'] = '<h3>'.join(sections)
+            row['star_rating'] = f"{rng.uniform(3.5, 5.0):.1f}"
+            writer.writerow(row)
+
+def prepare_site(cache_dir, size):
+    # 合成数据按规模缓存，重复运行时不必重新生成 5 万行 CSV
+    site_dir = os.path.join(cache_dir, f"catalog-{size}")
+    csv_path = os.path.join(site_dir, 'data', 'vpn_raw.csv')
+    if not os.path.exists(csv_path):
+        os.makedirs(os.path.dirname(csv_path), exist_ok=True)
+        write_catalog(csv_path + '.tmp', size)
+        os.replace(csv_path + '.tmp', csv_path)
+    shutil.copy(os.path.join(REPO_DIR, 'config.json'), os.path.join(site_dir, 'config.json'))
+    # output 是指向 output.build-*/ 的符号链接
+    output = os.path.join(site_dir, 'output')
+    if os.path.islink(output): os.remove(output)
+    for path in [output, output + '.staging', output + '.old'] + glob.glob(output + '.build-*'):
+        shutil.rmtree(path, ignore_errors=True)
+    # 构建缓存放在 data/ 下，冷构建前一并清掉
+    for path in glob.glob(os.path.join(site_dir, 'data', '*-cache*.pickle')): os.remove(path)
+    return site_dir
+
+def run_one(site_dir, jobs, incremental):
+    # 子进程入口：构建一次，profile 写入 site_dir/profile.json；不传 logo_fetcher（相当于 --no-fetch-logos），不访问网络
+    import generator
+    gen = generator.VPNGenerator(jobs=jobs, incremental=incremental, base_dir=site_dir, logo_fetcher=None,
+                                 profile_path=os.path.join(site_dir, 'profile.json'))
+    gen.run()
+
+def build(site_dir, jobs, incremental=False):
+    cmd = [sys.executable, os.path.abspath(__file__), '--run-one', site_dir, '--jobs', str(jobs)]
+    if incremental: cmd.append('--incremental')
+    subprocess.check_call(cmd, stdout=subprocess.DEVNULL)
+    with open(os.path.join(site_dir, 'profile.json'), 'r', encoding='utf-8') as f: return json.load(f)
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_DIR, stderr=subprocess.DEVNULL).decode().strip()
+    except Exception:
+        return None
+
+def previous_results():
+    latest = {}
+    if os.path.exists(RESULTS_PATH):
+        with open(RESULTS_PATH, 'r', encoding='utf-8') as f:
+            for line in f:
+                entry = json.loads(line)
+                latest[(entry['providers'], entry['jobs'], entry['mode'])] = entry
+    return latest
+
+def delta(current, previous, key, label):
+    if not previous or not previous.get(key) or current.get(key) is None: return ""
+    return f" {label} {(current[key] - previous[key]) / previous[key] * 100:+.0f}%"
+
+def main():
+    parser = argparse.ArgumentParser(description="Synthetic-catalog build benchmark")
+    parser.add_argument('--sizes', default=DEFAULT_SIZES, help=f"comma-separated catalog sizes (default: {DEFAULT_SIZES})")
+    parser.add_argument('--jobs', type=int, default=1)
+    parser.add_argument('--cache-dir', default=os.path.join(tempfile.gettempdir(), 'vpn-arena-bench'))
+    parser.add_argument('--no-record', action='store_true', help="do not append to benchmarks/results.jsonl")
+    parser.add_argument('--run-one', metavar='SITE_DIR', help=argparse.SUPPRESS)
+    parser.add_argument('--incremental', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_one:
+        return run_one(args.run_one, args.jobs, args.incremental)
+
+    latest = previous_results()
+    revision = git_revision()
+    recorded_at = datetime.datetime.now(datetime.timezone.utc).replace(microsecond=0).isoformat()
+    print(f"{'providers':>9} {'mode':<5} {'seconds':>9} {'pages/s':>9} {'MB written':>10} {'peak RSS MB':>11}  {'slowest stage':<17} vs last run")
+    for size in [int(s) for s in args.sizes.split(',') if s]:
+        site_dir = prepare_site(args.cache_dir, size)
+        # full：冷构建；noop：紧接着的增量构建（无变化），衡量清单检查的固定开销
+        for mode, incremental in (('full', False), ('noop', True)):
+            report = build(site_dir, args.jobs, incremental)
+            rss = max(report['peak_rss_kb'] or 0, report['peak_rss_children_kb'] or 0)
+            entry = {
+                "recorded_at": recorded_at, "revision": revision, "version": report['version'],
+                "providers": size, "jobs": args.jobs, "mode": mode, "status": report['status'],
+                "seconds": report['seconds'], "pages_per_sec": report['pages_per_sec'],
+                "bytes": report['bytes'], "peak_rss_kb": rss,
+                "stages": {stage['stage']: stage['seconds'] for stage in report['stages']},
+            }
+            previous = latest.get((size, args.jobs, mode))
+            slowest = max(report['stages'], key=lambda stage: stage['seconds'])['stage'] if report['stages'] else '-'
+            print(f"{size:>9} {mode:<5} {entry['seconds']:>9.2f} {entry['pages_per_sec']:>9.0f} "
+                  f"{entry['bytes'] / 1e6:>10.1f} {rss / 1024:>11.1f}  {slowest:<17}"
+                  f"{delta(entry, previous, 'seconds', 'time')}{delta(entry, previous, 'peak_rss_kb', 'rss')}")
+            if not args.no_record:
+                with open(RESULTS_PATH, 'a', encoding='utf-8') as f: f.write(json.dumps(entry, sort_keys=True) + '\n')
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""Detail page rendering: precompiled Template layer vs the V5.0 per-page f-string renderer.
+
+Usage: python benchmarks/bench_render.py --pages 5000
+"""
+
+import os
+import csv
+import sys
+import json
+import time
+import argparse
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(REPO_DIR, 'src'))
+from generator import VPNGenerator
+from catalog import Provider
+
+LEGACY_FAVICON = "data:image/svg+xml,<svg xmlns=%22http://www.w3.org/2000/svg%22 viewBox=%220 0 100 100%22><text y=%22.9em%22 font-size=%2290%22>🛡️</text></svg>"
+LEGACY_COMMON_SCRIPT = """
+        <script>
+            function triggerExitPopup() {
+                if (localStorage.getItem('hasSeenExitPopup') === 'yes') return;
+                var popup = document.getElementById('exitPopup');
+                if (popup) {
+                    popup.style.display = 'flex';
+                    localStorage.setItem('hasSeenExitPopup', 'yes');
+                }
+            }
+            document.addEventListener('mouseleave', function(e) {
+                if (e.clientY < 0) triggerExitPopup();
+            });
+            function closePopup() { document.getElementById('exitPopup').style.display = 'none'; }
+            function topBarClick() { triggerExitPopup(); }
+        </script>
+        """
+
+# V5.0 的 get_head_html / generate_schema_json / render_detail（每页重新拼接 head、footer、弹窗并序列化整个 schema），作为对照组
+def legacy_head_html(config, title, description, schema_json=None):
+    ga_script = ""
+    if config.get('google_analytics_id') and config['google_analytics_id'].startswith("G-"):
+        ga_script = f"""<script async src="https://www.googletagmanager.com/gtag/js?id={config['google_analytics_id']}"></script>
+            <script>window.dataLayer=window.dataLayer||[];function gtag(){{dataLayer.push(arguments);}}gtag('js',new Date());gtag('config','{config['google_analytics_id']}');</script>"""
+    schema_html = f'<script type="application/ld+json">{schema_json}</script>' if schema_json else ""
+    return f"""<head>
+            <meta charset="UTF-8"><meta name="viewport" content="width=device-width, initial-scale=1.0">
+            <title>{title}</title><meta name="description" content="{description}">
+            <link rel="icon" href="{LEGACY_FAVICON}">
+            <link rel="stylesheet" href="/static/style.css">
+            {ga_script}{schema_html}
+        </head>"""
+
+def legacy_schema_json(config, vpn):
+    provider = vpn['Provider']
+    try:
+        rating_val = float(vpn.get('star_rating', '4.5'))
+    except ValueError:
+        rating_val = 4.5
+    return json.dumps({
+        "@context": "https://schema.org/",
+        "@type": "Product",
+        "name": provider,
+        "description": vpn.get('seo_meta_desc', f"Review of {provider}"),
+        "review": {
+            "@type": "Review",
+            "reviewRating": {"@type": "Rating", "ratingValue": str(rating_val), "bestRating": "5"},
+            "author": {"@type": "Organization", "name": config['site_name']},
+        },
+        "aggregateRating": {"@type": "AggregateRating", "ratingValue": str(rating_val), "reviewCount": "1280"},
+    })
+
+def legacy_render_detail(gen, vpn):
+    config = gen.config
+    provider = vpn['Provider']
+    aff_link = gen.get_affiliate_link(provider, vpn.get('Affiliate_Link', '#'))
+    logo_url = f"https://www.google.com/s2/favicons?domain={gen.get_real_domain(provider)}&sz=128"
+    long_review = vpn.get('Long_Review', '')
+    if not long_review or len(long_review) < 50:
+        long_review = f"<h3>Why {provider}?</h3><p>Detailed review coming soon...</p>"
+    seo_title = vpn.get('seo_title', f"{provider} Review 2026 - Is It Safe?")
+    seo_desc = vpn.get('seo_meta_desc', f"Read our honest review of {provider}. Speed test results and security analysis.")
+    rating = vpn.get('star_rating', '4.5')
+    pros_html = "".join([f'<div class="pro-item">{p.strip()}</div>' for p in vpn.get('pros_list', '').split('|') if p.strip()])
+    cons_html = "".join([f'<div class="con-item">{p.strip()}</div>' for p in vpn.get('cons_list', '').split('|') if p.strip()])
+    pros_cons_box = ""
+    if pros_html or cons_html:
+        pros_cons_box = f"""
+            <div class="pros-cons">
+                <div class="pros"><h3>What We Like</h3>{pros_html}</div>
+                <div class="cons"><h3>What Could Be Better</h3>{cons_html}</div>
+            </div>
+            """
+    top_bar_html = f'''<div class="top-bar" onclick="topBarClick()">🔥 Limited Time: Get 68% OFF {provider}!</div>'''
+    disclaimer = config.get('legal', {}).get('disclosure', 'Advertiser Disclosure: We are reader-supported.')
+    schema_json = legacy_schema_json(config, vpn)
+    return f"""<!DOCTYPE html><html lang="en">
+        {legacy_head_html(config, seo_title, seo_desc, schema_json)}
+        <body>
+            {top_bar_html}
+            <div class="container" style="margin-top:20px;">
+                <div class="breadcrumbs">
+                    <a href="index.html">Home</a> <span>/</span> Reviews <span>/</span> {provider}
+                </div>
+                <div class="card" style="padding:40px; text-align:center;">
+                    <img src="{logo_url}" style="width:64px; height:64px; border-radius:50%; margin-bottom:20px; box-shadow:0 4px 10px rgba(0,0,0,0.1);">
+                    <h1 style="margin:0;">{provider} Review</h1>
+                    <div class="star-rating" style="margin:10px 0; font-size:1.2rem;">⭐⭐⭐⭐⭐ {rating}/5.0</div>
+                    <a href="{aff_link}" class="btn" style="margin-top:20px; font-size:1.1rem; padding:15px 30px;" target="_blank" rel="nofollow">Get 68% OFF {provider} &rarr;</a>
+                </div>
+                <div class="card" style="margin-top:20px; padding:40px;">
+                    {pros_cons_box}
+                    <div style="max-width:800px; margin:20px auto; line-height:1.8;">
+                        {long_review}
+                    </div>
+                </div>
+                <footer>
+                    <p>&copy; {config.get('year', '2026')} {config['site_name']}.</p>
+                    <div class="disclosure">{disclaimer}</div>
+                    <p style="margin-top:20px;"><a href="privacy.html">Privacy</a> • <a href="terms.html">Terms</a></p>
+                </footer>
+            </div>
+            <div class="exit-popup" id="exitPopup">
+                <div class="popup-box">
+                    <span class="close-btn" onclick="closePopup()">&times;</span>
+                    <div style="font-size:3rem; margin-bottom:10px;">🎁</div>
+                    <h2>Wait! Don't Overpay.</h2>
+                    <p>We found a secret <strong>68% OFF</strong> deal.</p>
+                    <a href="{aff_link}" class="btn" style="width:100%; box-sizing:border-box; margin-top:15px; background:#ef4444;">Claim Discount</a>
+                </div>
+            </div>
+            {LEGACY_COMMON_SCRIPT}
+        </body></html>"""
+
+def bench(label, render, rows, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for row in rows: render(row)
+        best = min(best, time.perf_counter() - start)
+    print(f"{label:<28} {best * 1000:9.2f} ms  ({len(rows) / best:,.0f} pages/s)")
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--pages', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    # 使用仓库中的 CSV 与 config.json，循环复制到 --pages 行；两组都包含联盟链接查找与 JSON-LD
+    with open(os.path.join(REPO_DIR, 'data', 'vpn_raw.csv'), 'r', encoding='utf-8-sig') as f:
+        raw = [{k.strip(): v for k, v in row.items() if k} for row in csv.DictReader(f) if row.get('Provider')]
+    raw = [raw[i % len(raw)] for i in range(args.pages)]
+    providers = [Provider.from_row(row) for row in raw]
+    gen = VPNGenerator(base_dir=REPO_DIR)
+    # 不写 logo 文件：两组使用相同形式的外部 favicon URL
+    gen.logo_urls = {gen.get_real_domain(vpn.name): f"https://www.google.com/s2/favicons?domain={gen.get_real_domain(vpn.name)}&sz=128" for vpn in providers}
+
+    print(f"catalog: {len(raw)} pages")
+    legacy = bench("f-string renderer (V5.0)", lambda row: legacy_render_detail(gen, row), raw, args.repeat)
+    compiled = bench("Template layer", gen.render_detail, providers, args.repeat)
+    print(f"speedup: {legacy / compiled:.1f}x")
+
+if __name__ == "__main__":
+    main()
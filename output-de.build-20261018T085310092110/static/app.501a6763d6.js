@@ -0,0 +1,13 @@
+function triggerExitPopup() {
+    if (localStorage.getItem('hasSeenExitPopup') === 'yes') return;
+    var popup = document.getElementById('exitPopup');
+    if (popup) {
+        popup.style.display = 'flex';
+        localStorage.setItem('hasSeenExitPopup', 'yes');
+    }
+}
+document.addEventListener('mouseleave', function(e) {
+    if (e.clientY < 0) triggerExitPopup();
+});
+function closePopup() { document.getElementById('exitPopup').style.display = 'none'; }
+function topBarClick() { triggerExitPopup(); }
@@ -0,0 +1,66 @@
+(function() {
+    var box = document.getElementById('siteSearch');
+    if (!box || !window.fetch) return;
+    var base = box.getAttribute('data-base');
+    var input = box.querySelector('input');
+    var list = box.querySelector('.search-results');
+    var meta = null, shards = {}, chunks = {}, timer = null;
+    function load(path) { return fetch(base + path).then(function(r) { return r.json(); }); }
+    function shard(i) { return shards[i] || (shards[i] = load('shard-' + i + '.json')); }
+    function chunk(i) { return chunks[i] || (chunks[i] = load('docs-' + i + '.json')); }
+    function tokens(text) { return (text.toLowerCase().match(/[\p{L}\p{N}_]+/gu) || []).filter(function(t) { return t.length > 1; }); }
+    function show(query, docs, infos) {
+        if (input.value !== query) return;
+        list.innerHTML = '';
+        docs.forEach(function(doc, i) {
+            var info = infos[i][doc % meta.chunk], li = document.createElement('li'), a = document.createElement('a'), note = document.createElement('span');
+            a.href = info[0];
+            a.textContent = info[1];
+            note.textContent = '⭐ ' + info[2] + ' · ' + info[3];
+            li.appendChild(a);
+            li.appendChild(note);
+            list.appendChild(li);
+        });
+        if (!docs.length && query.trim()) {
+            var empty = document.createElement('li');
+            empty.textContent = box.getAttribute('data-empty');
+            list.appendChild(empty);
+        }
+    }
+    function search(query) {
+        var words = tokens(query);
+        if (!words.length) return show(query, [], []);
+        (meta ? Promise.resolve(meta) : load('meta.json')).then(function(m) {
+            meta = m;
+            words = words.filter(function(w) { return m.stop.indexOf(w) < 0; });
+            var needed = [];
+            Object.keys(m.shards).forEach(function(prefix) {
+                var hit = words.some(function(w) { return prefix.indexOf(w) === 0 || w.indexOf(prefix) === 0; });
+                if (hit && needed.indexOf(m.shards[prefix]) < 0) needed.push(m.shards[prefix]);
+            });
+            return Promise.all(needed.map(shard));
+        }).then(function(indexes) {
+            // 每个词取前缀匹配的最高分（完整匹配权重更高），多个词取交集后求和
+            var totals = null;
+            words.forEach(function(word) {
+                var scores = {};
+                indexes.forEach(function(index) {
+                    Object.keys(index).forEach(function(term) {
+                        if (term.indexOf(word) !== 0) return;
+                        var postings = index[term], idf = Math.log(1 + meta.docs * 2 / postings.length), boost = term === word ? 1 : 0.5;
+                        for (var i = 0; i < postings.length; i += 2) scores[postings[i]] = Math.max(scores[postings[i]] || 0, postings[i + 1] * idf * boost);
+                    });
+                });
+                if (totals === null) { totals = scores; return; }
+                Object.keys(totals).forEach(function(doc) { if (doc in scores) totals[doc] += scores[doc]; else delete totals[doc]; });
+            });
+            var docs = Object.keys(totals || {}).sort(function(a, b) { return totals[b] - totals[a]; }).slice(0, 8).map(Number);
+            return Promise.all(docs.map(function(doc) { return chunk(Math.floor(doc / meta.chunk)); })).then(function(infos) { show(query, docs, infos); });
+        }).catch(function() {});
+    }
+    input.addEventListener('input', function() {
+        clearTimeout(timer);
+        timer = setTimeout(function() { search(input.value); }, 150);
+    });
+    box.hidden = false;
+})();
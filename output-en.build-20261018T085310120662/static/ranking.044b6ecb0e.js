@@ -0,0 +1,55 @@
+(function() {
+    var tools = document.getElementById('rankingTools');
+    if (!tools || !window.fetch) return;
+    var meta = JSON.parse(tools.getAttribute('data-facets'));
+    var base = tools.getAttribute('data-base');
+    var body = document.getElementById('rankingBody');
+    var more = document.getElementById('rankingMore');
+    var pager = document.querySelector('.pagination');
+    var template = document.getElementById('rankRow').innerHTML;
+    var sortSelect = tools.querySelector('[data-role="sort"]');
+    var filterSelect = tools.querySelector('[data-role="filter"]');
+    var view = null;
+    function field(name) { return meta.fields.indexOf(name); }
+    function renderRow(values) {
+        var row = {};
+        meta.fields.forEach(function(name, i) { row[name] = values[i]; });
+        row.rank_class = row.rank === 1 ? 'rank-1' : '';
+        return template.replace(/@@(\w+)@@/g, function(m, key) { return row[key] == null ? '' : row[key]; });
+    }
+    function compare(sort) {
+        var key = field(sort === 'rating' ? 'rating_value' : sort === 'price' ? 'price_value' : 'rank');
+        var rank = field('rank'), dir = sort === 'rating' ? -1 : 1;
+        return function(a, b) {
+            if (a[key] === b[key]) return a[rank] - b[rank];
+            if (a[key] === null) return 1;
+            if (b[key] === null) return -1;
+            return (a[key] - b[key]) * dir;
+        };
+    }
+    function show() {
+        var rows = view.localSort ? view.rows.slice().sort(compare(view.sort)) : view.rows;
+        body.innerHTML = rows.map(renderRow).join('');
+        more.hidden = view.loaded >= view.pages;
+    }
+    function load() {
+        var current = view;
+        return fetch(base + current.shard + '-' + (current.loaded + 1) + '.json').then(function(r) { return r.json(); }).then(function(rows) {
+            if (view !== current) return;
+            current.rows = current.rows.concat(rows);
+            current.loaded++;
+            if (current.localSort && current.loaded < current.pages) return load();
+            show();
+        });
+    }
+    function update() {
+        var filter = filterSelect.value, sort = sortSelect.value, shard = filter || 'sort-' + sort;
+        view = {shard: shard, sort: sort, localSort: !!filter && sort !== 'rank', rows: [], loaded: 0, pages: meta.shards[shard]};
+        if (pager) pager.hidden = true;
+        load();
+    }
+    sortSelect.addEventListener('change', update);
+    filterSelect.addEventListener('change', update);
+    more.addEventListener('click', load);
+    tools.hidden = false;
+})();
@@ -0,0 +1,144 @@
+import os
+import re
+import csv
+import pickle
+import hashlib
+
+# 解析后的 Provider 目录：CSV 每行只解析、校验一次，结果以二进制缓存保存在 CSV 旁边，
+# CSV 未变化（mtime/size 一致，或内容哈希一致）时直接读缓存，不再走 csv.DictReader
+
+CACHE_VERSION = 1
+CACHE_CHUNK_SIZE = 1000
+PRICE_RE = re.compile(r'\d+(?:\.\d+)?')
+# 顶层逗号（括号内的逗号不拆）："Limited (YouTube, Regional), Netflix" -> 两项
+SERVICE_SPLIT_RE = re.compile(r',\s*(?![^()]*\))')
+
+def split_list(value):
+    # "a | b||c" -> ('a', 'b', 'c')
+    return tuple(part.strip() for part in (value or '').split('|') if part.strip())
+
+def split_services(value):
+    return tuple(part.strip() for part in SERVICE_SPLIT_RE.split(value or '') if part.strip() and part.strip() != 'N/A')
+
+def parse_price(value):
+    # "$6.67" -> 6.67，"€5.00 (~$5.40)" -> 5.0（取第一个金额）；"N/A" -> None
+    match = PRICE_RE.search(value or '')
+    return float(match.group()) if match else None
+
+def parse_rating(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 4.5
+
+class Provider:
+    __slots__ = ('name', 'price_monthly', 'price_value', 'server_count', 'no_logs', 'streaming_support',
+                 'streaming_services', 'money_back', 'affiliate_link', 'badge', 'seo_title', 'seo_meta_desc',
+                 'star_rating', 'rating_value', 'best_for', 'pros', 'cons', 'lsi_keywords', 'long_review')
+
+    def __init__(self, *values):
+        for field, value in zip(self.__slots__, values):
+            setattr(self, field, value)
+
+    @classmethod
+    def from_row(cls, row):
+        # 缺省值只在这里出现一次；CSV 中存在但为空的字段保持原样（与旧的 dict.get 语义一致）
+        def field(key, default=''):
+            value = row.get(key)
+            return default if value is None else value
+        name = row['Provider']
+        star_rating = field('star_rating', '4.5')
+        price, streaming = field('Price_Monthly', 'N/A'), field('Streaming_Support', 'N/A')
+        return cls(
+            name, price, parse_price(price), field('Server_Count'), field('No_Logs'),
+            streaming, split_services(streaming), field('Money_Back'), field('Affiliate_Link', '#'), field('Badge'),
+            field('seo_title', f"{name} Review 2026 - Is It Safe?"),
+            field('seo_meta_desc', f"Read our honest review of {name}. Speed test results and security analysis."),
+            star_rating, parse_rating(star_rating), field('best_for', 'Privacy'),
+            split_list(row.get('pros_list')), split_list(row.get('cons_list')), split_list(row.get('lsi_keywords')),
+            field('Long_Review'),
+        )
+
+    def to_tuple(self):
+        return tuple(getattr(self, field) for field in self.__slots__)
+
+    def __reduce__(self):
+        # 发送给子进程时只传字段元组
+        return (Provider, self.to_tuple())
+
+    def __repr__(self):
+        return f"Provider({self.name!r})"
+
+    def without_review(self):
+        # 首页只需要排名字段，不保留评测正文
+        light = Provider(*self.to_tuple())
+        light.long_review = ''
+        return light
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def iter_csv(csv_path):
+    with open(csv_path, 'r', encoding='utf-8-sig') as f:
+        for row in csv.DictReader(f):
+            if row.get('Provider'):
+                # 数据清洗：处理 CSV 表头可能存在的空格
+                yield Provider.from_row({k.strip(): v for k, v in row.items() if k})
+
+def read_cache_header(cache_path):
+    try:
+        with open(cache_path, 'rb') as f:
+            header = pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ValueError):
+        return None
+    if not isinstance(header, dict) or header.get('version') != CACHE_VERSION or header.get('fields') != Provider.__slots__:
+        return None
+    return header
+
+def iter_cache(cache_path):
+    with open(cache_path, 'rb') as f:
+        pickle.load(f)
+        while True:
+            try:
+                chunk = pickle.load(f)
+            except EOFError:
+                return
+            for values in chunk:
+                yield Provider(*values)
+
+def write_through(records, cache_path, header):
+    # 边读边写：按块 pickle，记录不全部驻留内存；完整遍历后才原子替换缓存文件
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(header, f, pickle.HIGHEST_PROTOCOL)
+            chunk = []
+            for record in records:
+                chunk.append(record.to_tuple())
+                if len(chunk) >= CACHE_CHUNK_SIZE:
+                    pickle.dump(chunk, f, pickle.HIGHEST_PROTOCOL)
+                    chunk = []
+                yield record
+            if chunk: pickle.dump(chunk, f, pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    finally:
+        if os.path.exists(tmp_path): os.remove(tmp_path)
+
+def iter_catalog(csv_path, cache_path=None):
+    # 流式返回 Provider；cache_path 为 None 时不使用缓存
+    if not os.path.exists(csv_path): return iter(())
+    if not cache_path: return iter_csv(csv_path)
+    st = os.stat(csv_path)
+    header = read_cache_header(cache_path)
+    if header and (header['mtime_ns'], header['size']) == (st.st_mtime_ns, st.st_size):
+        return iter_cache(cache_path)
+    digest = file_sha256(csv_path)
+    fresh = {"version": CACHE_VERSION, "fields": Provider.__slots__, "mtime_ns": st.st_mtime_ns, "size": st.st_size, "sha256": digest}
+    if header and header['sha256'] == digest:
+        # 内容未变（如重新 checkout 只改了 mtime）：从旧缓存重写一份带新 mtime 的
+        return write_through(iter_cache(cache_path), cache_path, fresh)
+    return write_through(iter_csv(csv_path), cache_path, fresh)
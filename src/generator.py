@@ -1,474 +1,1983 @@
-import csv
-import os
-import json
-import datetime
-import shutil
-import sys
-import base64
-
-# Tiandao VPN Generator V5.0 (SEO Enhanced & Schema Markup)
-# 核心升级：适配 n8n V7.0 数据结构，注入 Google 星级评分与富文本摘要
-
-class VPNGenerator:
-    def __init__(self):
-        self.base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        self.data_path = os.path.join(self.base_dir, 'data', 'vpn_raw.csv')
-        self.config_path = os.path.join(self.base_dir, 'config.json')
-        self.output_dir = os.path.join(self.base_dir, 'output')
-        self.static_dir = os.path.join(self.base_dir, 'static')
-        self.generated_urls = []
-        self.config = self.load_config()
-
-        # VPN 域名修正字典
-        self.domain_map = {
-            "Private Internet Access": "privateinternetaccess.com",
-            "PIA": "privateinternetaccess.com",
-            "PureVPN": "purevpn.com",
-            "IPVanish": "ipvanish.com",
-            "ProtonVPN": "protonvpn.com",
-            "Windscribe": "windscribe.com",
-            "TunnelBear": "tunnelbear.com",
-            "Hide.me": "hide.me",
-            "Mullvad": "mullvad.net",
-            "Atlas VPN": "atlasvpn.com",
-            "StrongVPN": "strongvpn.com",
-            "PrivadoVPN": "privadovpn.com",
-            "NordVPN": "nordvpn.com",
-            "ExpressVPN": "expressvpn.com",
-            "Surfshark": "surfshark.com",
-            "CyberGhost": "cyberghostvpn.com"
-        }
-
-    def log(self, message):
-        print(f"[VPN-GEN] {message}")
-
-    def load_config(self):
-        config = {
-            "site_name": "Privacy Shield VPN",
-            "domain": "https://vpn.ii-x.com",
-            "year": "2026",
-            "google_analytics_id": "",
-            "affiliate_map": {}, 
-            "top_bar": {"enabled": True, "text": "🔥 Limited Time: Get 68% OFF Top VPNs!", "link": "#ranking"},
-            "legal": {"disclosure": "Advertiser Disclosure: We are reader-supported. We may receive a commission for purchases made through these links."}
-        }
-        if os.path.exists(self.config_path):
-            try:
-                with open(self.config_path, 'r', encoding='utf-8') as f:
-                    loaded = json.load(f)
-                    config.update(loaded)
-                self.log("✅ Config loaded.")
-            except: pass
-        return config
-
-    def load_data(self):
-        self.log(f"📂 Loading data from {self.data_path}...")
-        if not os.path.exists(self.data_path): return []
-        data = []
-        try:
-            with open(self.data_path, 'r', encoding='utf-8-sig') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    if row.get('Provider'): 
-                        # 数据清洗：处理 CSV 可能存在的空格
-                        clean_row = {k.strip(): v for k, v in row.items() if k}
-                        data.append(clean_row)
-            self.log(f"✅ Loaded {len(data)} VPNs.")
-            return data
-        except Exception as e:
-            self.log(f"❌ CSV Error: {e}")
-            return []
-
-    def get_affiliate_link(self, provider, original_link):
-        clean_name = str(provider).strip().lower()
-        mapping = self.config.get('affiliate_map', {})
-        for key, link in mapping.items():
-            if key.lower() in clean_name and link: return link
-        return original_link
-    
-    def get_real_domain(self, provider_name):
-        clean = str(provider_name).strip()
-        if clean in self.domain_map:
-            return self.domain_map[clean]
-        return f"{clean.lower().replace(' ', '')}.com"
-
-    # --- Schema Markup 生成器 (让 Google 显示星星) ---
-    def generate_schema_json(self, vpn):
-        provider = vpn['Provider']
-        rating = vpn.get('star_rating', '4.5')
-        try:
-            rating_val = float(rating)
-        except:
-            rating_val = 4.5
-            
-        schema = {
-            "@context": "https://schema.org/",
-            "@type": "Product",
-            "name": provider,
-            "description": vpn.get('seo_meta_desc', f"Review of {provider}"),
-            "review": {
-                "@type": "Review",
-                "reviewRating": {
-                    "@type": "Rating",
-                    "ratingValue": str(rating_val),
-                    "bestRating": "5"
-                },
-                "author": {
-                    "@type": "Organization",
-                    "name": self.config['site_name']
-                }
-            },
-            "aggregateRating": {
-                "@type": "AggregateRating",
-                "ratingValue": str(rating_val),
-                "reviewCount": "1280"
-            }
-        }
-        return json.dumps(schema)
-
-    def get_common_script(self):
-        return """
-        <script>
-            function triggerExitPopup() {
-                if (localStorage.getItem('hasSeenExitPopup') === 'yes') return;
-                var popup = document.getElementById('exitPopup');
-                if (popup) {
-                    popup.style.display = 'flex';
-                    localStorage.setItem('hasSeenExitPopup', 'yes');
-                }
-            }
-            document.addEventListener('mouseleave', function(e) {
-                if (e.clientY < 0) triggerExitPopup();
-            });
-            function closePopup() { document.getElementById('exitPopup').style.display = 'none'; }
-            function topBarClick() { triggerExitPopup(); }
-        </script>
-        """
-
-    def generate_css(self):
-        css_content = """
-        :root { --primary: #2563eb; --secondary: #1e40af; --accent: #ef4444; --bg: #f8fafc; --text: #1e293b; --star: #f59e0b; }
-        body { font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, Helvetica, Arial, sans-serif; background: var(--bg); color: var(--text); margin: 0; line-height: 1.6; display: flex; flex-direction: column; min-height: 100vh; }
-        .container { max-width: 1100px; margin: 0 auto; padding: 20px; width: 100%; box-sizing: border-box; flex: 1; }
-        
-        /* Top Bar */
-        .top-bar { position: sticky; top: 0; z-index: 9000; background: var(--accent); color: white; text-align: center; padding: 12px; font-weight: 700; font-size: 14px; cursor: pointer; transition: background 0.2s; user-select: none; box-shadow: 0 2px 5px rgba(0,0,0,0.1); }
-        .top-bar:hover { background: #dc2626; text-decoration: underline; }
-        
-        /* Headers */
-        header { text-align: center; padding: 60px 20px; background: linear-gradient(135deg, #1e293b 0%, #0f172a 100%); color: white; border-radius: 0 0 20px 20px; margin-bottom: 40px; }
-        h1 { font-size: 2.5rem; margin: 0 0 15px 0; letter-spacing: -1px; }
-        .subtitle { font-size: 1.2rem; color: #94a3b8; max-width: 600px; margin: 0 auto; }
-        
-        /* Champion Card */
-        .champion-card { background: white; border: 2px solid var(--primary); border-radius: 16px; padding: 30px; margin-bottom: 40px; box-shadow: 0 10px 25px -5px rgba(37, 99, 235, 0.2); position: relative; overflow: hidden; }
-        .ribbon { position: absolute; top: 0; right: 0; background: var(--primary); color: white; padding: 8px 15px; border-bottom-left-radius: 12px; font-weight: bold; font-size: 0.9rem; }
-        
-        /* Tables */
-        .card { background: white; border-radius: 12px; box-shadow: 0 4px 6px -1px rgba(0,0,0,0.05); border: 1px solid #e2e8f0; overflow: hidden; margin-bottom: 20px; }
-        table { width: 100%; border-collapse: collapse; }
-        th { text-align: left; padding: 18px; background: #f8fafc; color: #64748b; font-size: 0.85rem; text-transform: uppercase; border-bottom: 1px solid #e2e8f0; }
-        td { padding: 20px 18px; border-bottom: 1px solid #f1f5f9; vertical-align: middle; }
-        tr:hover { background-color: #f8fafc; }
-        
-        /* New Elements (Stars & Badges) */
-        .star-rating { color: var(--star); font-weight: 800; letter-spacing: 1px; white-space: nowrap; }
-        .rank-circle { width: 32px; height: 32px; background: #f1f5f9; border-radius: 50%; display: flex; align-items: center; justify-content: center; font-weight: 800; color: #94a3b8; }
-        .rank-1 { background: #fef3c7; color: #d97706; border: 2px solid #fcd34d; }
-        .badge { background: #dbeafe; color: var(--primary); padding: 4px 10px; border-radius: 20px; font-size: 0.75rem; font-weight: 700; text-transform: uppercase; white-space: nowrap; display: inline-block; margin-top: 5px; }
-        .badge-green { background: #dcfce7; color: #166534; }
-        
-        /* Pros & Cons Box */
-        .pros-cons { display: grid; grid-template-columns: 1fr 1fr; gap: 20px; margin-top: 30px; background: #f8fafc; padding: 20px; border-radius: 12px; }
-        .pros h3 { color: #166534; margin-top: 0; font-size: 1.1rem; }
-        .cons h3 { color: #991b1b; margin-top: 0; font-size: 1.1rem; }
-        .pro-item, .con-item { margin-bottom: 8px; font-size: 0.95rem; }
-        .pro-item:before { content: "✅ "; }
-        .con-item:before { content: "❌ "; }
-
-        /* Buttons */
-        .btn { display: inline-block; background: var(--primary); color: white; padding: 12px 24px; border-radius: 8px; text-decoration: none; font-weight: 700; transition: 0.2s; white-space: nowrap; text-align: center; cursor: pointer; }
-        .btn:hover { background: var(--secondary); transform: translateY(-1px); box-shadow: 0 4px 12px rgba(37, 99, 235, 0.3); }
-        .btn-outline { color: #475569; text-decoration: none; font-size: 0.9rem; margin-top: 10px; display: inline-block; border: 1px solid #cbd5e1; padding: 8px 16px; border-radius: 6px; transition: 0.2s; background: white; cursor: pointer; }
-        .btn-outline:hover { border-color: var(--primary); color: var(--primary); background: #eff6ff; }
-        
-        .breadcrumbs { font-size: 0.9rem; color: #64748b; margin-bottom: 20px; }
-        .breadcrumbs a { color: var(--primary); text-decoration: none; }
-        .breadcrumbs span { margin: 0 8px; color: #cbd5e1; }
-
-        /* Mobile */
-        @media (max-width: 768px) {
-            header { padding: 30px 20px; }
-            h1 { font-size: 1.8rem; }
-            thead { display: none; }
-            tr { display: flex; flex-direction: column; padding: 20px; border-bottom: 8px solid #f8fafc; }
-            td { padding: 5px 0; border: none; }
-            .pros-cons { grid-template-columns: 1fr; }
-            .btn, .btn-outline { display: block; width: 100%; margin-top: 10px; box-sizing: border-box; }
-        }
-
-        footer { text-align: center; margin-top: auto; color: #94a3b8; font-size: 0.9rem; padding: 40px 0; background: #fff; border-top: 1px solid #f1f5f9; }
-        .disclosure { background: #fffbeb; color: #92400e; padding: 12px; font-size: 0.85rem; border-radius: 8px; display: inline-block; margin-top: 20px; max-width: 600px; }
-        
-        .exit-popup { display: none; position: fixed; top: 0; left: 0; width: 100%; height: 100%; background: rgba(0,0,0,0.8); z-index: 99999; justify-content: center; align-items: center; backdrop-filter: blur(5px); }
-        .popup-box { background: white; padding: 40px; border-radius: 16px; text-align: center; max-width: 400px; position: relative; animation: popIn 0.3s ease; }
-        @keyframes popIn { from {transform: scale(0.9); opacity: 0;} to {transform: scale(1); opacity: 1;} }
-        .close-btn { position: absolute; top: 15px; right: 20px; cursor: pointer; font-size: 24px; color: #cbd5e1; }
-        """
-        static_out = os.path.join(self.output_dir, 'static')
-        if not os.path.exists(static_out): os.makedirs(static_out)
-        with open(os.path.join(static_out, 'style.css'), 'w', encoding='utf-8') as f: f.write(css_content)
-
-    def get_head_html(self, title, description, schema_json=None):
-        ga_script = ""
-        if self.config.get('google_analytics_id') and self.config['google_analytics_id'].startswith("G-"):
-            ga_script = f"""<script async src="https://www.googletagmanager.com/gtag/js?id={self.config['google_analytics_id']}"></script>
-            <script>window.dataLayer=window.dataLayer||[];function gtag(){{dataLayer.push(arguments);}}gtag('js',new Date());gtag('config','{self.config['google_analytics_id']}');</script>"""
-        
-        schema_html = f'<script type="application/ld+json">{schema_json}</script>' if schema_json else ""
-        favicon_base64 = "data:image/svg+xml,<svg xmlns=%22http://www.w3.org/2000/svg%22 viewBox=%220 0 100 100%22><text y=%22.9em%22 font-size=%2290%22>🛡️</text></svg>"
-
-        return f"""<head>
-            <meta charset="UTF-8"><meta name="viewport" content="width=device-width, initial-scale=1.0">
-            <title>{title}</title><meta name="description" content="{description}">
-            <link rel="icon" href="{favicon_base64}">
-            <link rel="stylesheet" href="/static/style.css">
-            {ga_script}{schema_html}
-        </head>"""
-
-    def generate_index(self, vpns):
-        self.log("🏆 Generating Index Page...")
-        
-        champion = vpns[0] if vpns else None
-        champion_html = ""
-        if champion:
-            aff_link = self.get_affiliate_link(champion['Provider'], champion.get('Affiliate_Link', '#'))
-            slug = f"{str(champion['Provider']).lower().replace(' ', '-')}-review.html"
-            logo_url = f"https://www.google.com/s2/favicons?domain={self.get_real_domain(champion['Provider'])}&sz=128"
-            
-            # 使用新字段
-            rating = champion.get('star_rating', '4.9')
-            best_for = champion.get('best_for', 'All-Rounder')
-            
-            champion_html = f"""
-            <div class="champion-card">
-                <div class="ribbon">🏆 #1 RANKED</div>
-                <div style="display:flex; justify-content:space-between; align-items:center; flex-wrap:wrap; gap:20px;">
-                    <div style="flex:1;">
-                        <div style="display:flex; align-items:center; gap:15px; margin-bottom:10px;">
-                            <img src="{logo_url}" style="width:48px; height:48px; border-radius:50%; box-shadow:0 2px 5px rgba(0,0,0,0.1);">
-                            <h2 style="margin:0; font-size:1.8rem;">{champion['Provider']}</h2>
-                        </div>
-                        <p style="margin:0; color:#64748b;">The best overall VPN for speed, security, and streaming in 2026.</p>
-                        <div style="margin-top:15px;">
-                            <span class="badge">🚀 Fastest</span>
-                            <span class="badge badge-green">🏆 {best_for}</span>
-                            <span class="star-rating" style="margin-left:10px;">⭐⭐⭐⭐⭐ {rating}</span>
-                        </div>
-                    </div>
-                    <div style="text-align:center; min-width:150px;">
-                        <div class="price">{champion.get('Price_Monthly', 'N/A')}</div>
-                        <div class="period">per month</div>
-                        <a href="{aff_link}" class="btn" style="width:100%; box-sizing:border-box; margin-top:10px; background:#ef4444;">Get Deal &rarr;</a>
-                        <a href="{slug}" class="btn-outline">📖 Read Review</a>
-                    </div>
-                </div>
-            </div>"""
-
-        rows_html = ""
-        for index, vpn in enumerate(vpns):
-            aff_link = self.get_affiliate_link(vpn['Provider'], vpn.get('Affiliate_Link', '#'))
-            detail_slug = f"{str(vpn['Provider']).lower().replace(' ', '-')}-review.html"
-            logo_url = f"https://www.google.com/s2/favicons?domain={self.get_real_domain(vpn['Provider'])}&sz=64"
-            rank_class = "rank-1" if index == 0 else ""
-            rating = vpn.get('star_rating', '4.5')
-            
-            rows_html += f"""
-            <tr onclick="window.location='{detail_slug}'" style="cursor:pointer;">
-                <td width="5%"><div class="rank-circle {rank_class}">#{index + 1}</div></td>
-                <td width="30%">
-                    <div style="display:flex; align-items:center; gap:12px;">
-                        <img src="{logo_url}" style="width:24px; height:24px; border-radius:4px;">
-                        <div>
-                            <div style="font-weight:bold; color:#0f172a;">{vpn['Provider']}</div>
-                            <div class="star-rating" style="font-size:0.8rem;">⭐⭐⭐⭐⭐ {rating}</div>
-                        </div>
-                    </div>
-                </td>
-                <td><ul style="margin:0; padding-left:15px; font-size:0.85rem; color:#64748b;">
-                    <li><b>Best For:</b> {vpn.get('best_for', 'Privacy')}</li>
-                    <li>Streaming: {vpn.get('Streaming_Support', 'N/A')}</li>
-                </ul></td>
-                <td width="15%"><div style="font-weight:800; font-size:1.1rem; color:#0f172a;">{vpn.get('Price_Monthly', 'N/A')}</div></td>
-                <td width="20%">
-                    <a href="{aff_link}" class="btn" onclick="event.stopPropagation();" target="_blank" rel="nofollow">Visit Site</a>
-                    <a href="{detail_slug}" class="btn-outline" onclick="event.stopPropagation();">Review</a>
-                </td>
-            </tr>"""
-
-        top_bar_html = f'''<div class="top-bar" onclick="topBarClick()">{self.config["top_bar"]["text"]}</div>''' if self.config['top_bar']['enabled'] else ""
-
-        html = f"""<!DOCTYPE html><html lang="en">
-        {self.get_head_html(f"Best VPNs for {self.config.get('year', '2026')} - Speed & Privacy Tested", "Compare top VPNs used by experts. Find the fastest, most secure VPN for streaming and gaming.")}
-        <body>
-            {top_bar_html}
-            <header>
-                <div class="container">
-                    <h1>🛡️ {self.config['site_name']}</h1>
-                    <p class="subtitle">Trusted by 2M+ users. We tested 50+ VPNs for speed & security.</p>
-                </div>
-            </header>
-            <div class="container" style="margin-top:-60px;">
-                {champion_html}
-                <div class="card">
-                    <table>
-                        <thead><tr><th>Rank</th><th>Provider</th><th>Verdict</th><th>Price</th><th>Action</th></tr></thead>
-                        <tbody>{rows_html}</tbody>
-                    </table>
-                </div>
-                <footer>
-                    <p>&copy; {self.config.get('year', '2026')} {self.config['site_name']}.</p>
-                    <div class="disclosure">{self.config.get('legal', {}).get('disclosure', 'Advertiser Disclosure: We are reader-supported.')}</div>
-                    <p style="margin-top:20px;"><a href="privacy.html">Privacy Policy</a> • <a href="terms.html">Terms</a></p>
-                </footer>
-            </div>
-            <div class="exit-popup" id="exitPopup">
-                <div class="popup-box">
-                    <span class="close-btn" onclick="closePopup()">&times;</span>
-                    <div style="font-size:3rem; margin-bottom:10px;">🎁</div>
-                    <h2>Wait! Don't Overpay.</h2>
-                    <p>We found a secret <strong>68% OFF</strong> deal.</p>
-                    <a href="#ranking" class="btn" onclick="closePopup()" style="width:100%; box-sizing:border-box; margin-top:15px; background:#ef4444;">Claim Discount</a>
-                </div>
-            </div>
-            {self.get_common_script()}
-        </body></html>"""
-        with open(os.path.join(self.output_dir, 'index.html'), 'w', encoding='utf-8') as f: f.write(html)
-
-    def generate_details(self, vpns):
-        self.log("📝 Generating Detail Pages...")
-        for vpn in vpns:
-            provider = vpn['Provider']
-            aff_link = self.get_affiliate_link(provider, vpn.get('Affiliate_Link', '#'))
-            slug = f"{str(provider).lower().replace(' ', '-')}-review.html"
-            logo_url = f"https://www.google.com/s2/favicons?domain={self.get_real_domain(provider)}&sz=128"
-            long_review = vpn.get('Long_Review', '')
-            if not long_review or len(long_review) < 50:
-                long_review = f"<h3>Why {provider}?</h3><p>Detailed review coming soon...</p>"
-
-            # SEO 字段
-            seo_title = vpn.get('seo_title', f"{provider} Review 2026 - Is It Safe?")
-            seo_desc = vpn.get('seo_meta_desc', f"Read our honest review of {provider}. Speed test results and security analysis.")
-            rating = vpn.get('star_rating', '4.5')
-            
-            # 优缺点处理
-            pros = vpn.get('pros_list', '').split('|')
-            cons = vpn.get('cons_list', '').split('|')
-            pros_html = "".join([f'<div class="pro-item">{p.strip()}</div>' for p in pros if p.strip()])
-            cons_html = "".join([f'<div class="con-item">{p.strip()}</div>' for p in cons if p.strip()])
-            
-            pros_cons_box = ""
-            if pros_html or cons_html:
-                pros_cons_box = f"""
-                <div class="pros-cons">
-                    <div class="pros"><h3>What We Like</h3>{pros_html}</div>
-                    <div class="cons"><h3>What Could Be Better</h3>{cons_html}</div>
-                </div>
-                """
-
-            top_bar_html = f'''<div class="top-bar" onclick="topBarClick()">🔥 Limited Time: Get 68% OFF {provider}!</div>'''
-            disclaimer = self.config.get('legal', {}).get('disclosure', 'Advertiser Disclosure: We are reader-supported.')
-            
-            # 生成 Schema
-            schema_json = self.generate_schema_json(vpn)
-
-            html = f"""<!DOCTYPE html><html lang="en">
-            {self.get_head_html(seo_title, seo_desc, schema_json)}
-            <body>
-                {top_bar_html}
-                <div class="container" style="margin-top:20px;">
-                    <div class="breadcrumbs">
-                        <a href="index.html">Home</a> <span>/</span> Reviews <span>/</span> {provider}
-                    </div>
-                    <div class="card" style="padding:40px; text-align:center;">
-                        <img src="{logo_url}" style="width:64px; height:64px; border-radius:50%; margin-bottom:20px; box-shadow:0 4px 10px rgba(0,0,0,0.1);">
-                        <h1 style="margin:0;">{provider} Review</h1>
-                        <div class="star-rating" style="margin:10px 0; font-size:1.2rem;">⭐⭐⭐⭐⭐ {rating}/5.0</div>
-                        <a href="{aff_link}" class="btn" style="margin-top:20px; font-size:1.1rem; padding:15px 30px;" target="_blank" rel="nofollow">Get 68% OFF {provider} &rarr;</a>
-                    </div>
-                    
-                    <div class="card" style="margin-top:20px; padding:40px;">
-                        {pros_cons_box}
-                        <div style="max-width:800px; margin:20px auto; line-height:1.8;">
-                            {long_review}
-                        </div>
-                    </div>
-                    
-                    <footer>
-                        <p>&copy; {self.config.get('year', '2026')} {self.config['site_name']}.</p>
-                        <div class="disclosure">{disclaimer}</div>
-                        <p style="margin-top:20px;"><a href="privacy.html">Privacy</a> • <a href="terms.html">Terms</a></p>
-                    </footer>
-                </div>
-                <div class="exit-popup" id="exitPopup">
-                    <div class="popup-box">
-                        <span class="close-btn" onclick="closePopup()">&times;</span>
-                        <div style="font-size:3rem; margin-bottom:10px;">🎁</div>
-                        <h2>Wait! Don't Overpay.</h2>
-                        <p>We found a secret <strong>68% OFF</strong> deal.</p>
-                        <a href="{aff_link}" class="btn" style="width:100%; box-sizing:border-box; margin-top:15px; background:#ef4444;">Claim Discount</a>
-                    </div>
-                </div>
-                {self.get_common_script()}
-            </body></html>"""
-            with open(os.path.join(self.output_dir, slug), 'w', encoding='utf-8') as f: f.write(html)
-            self.generated_urls.append(slug)
-
-    def generate_legal(self):
-        for page in ['privacy', 'terms']:
-            title = f"{page.capitalize()} Policy"
-            content = "<p>Your privacy is important to us. We use Google Analytics to improve user experience.</p>" if page == 'privacy' else "<p>By using this site, you agree to our terms.</p>"
-            html = f"""<!DOCTYPE html><html lang="en">
-            {self.get_head_html(title, title)}
-            <body>
-                <div class="container">
-                    <header style="padding:40px; margin-bottom:20px;"><h1>{title}</h1></header>
-                    <div class="card legal-content" style="padding:40px;">{content}</div>
-                    <footer><p><a href="index.html">Back to Home</a></p></footer>
-                </div>
-            </body></html>"""
-            with open(os.path.join(self.output_dir, f'{page}.html'), 'w', encoding='utf-8') as f: f.write(html)
-
-    def generate_sitemap(self):
-        base_url = self.config.get('domain', 'https://vpn.ii-x.com')
-        xml = '<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
-        xml += f'<url><loc>{base_url}/</loc><priority>1.0</priority></url>\n'
-        for url in self.generated_urls: xml += f'<url><loc>{base_url}/{url}</loc><priority>0.8</priority></url>\n'
-        xml += '</urlset>'
-        with open(os.path.join(self.output_dir, 'sitemap.xml'), 'w', encoding='utf-8') as f: f.write(xml)
-        with open(os.path.join(self.output_dir, 'robots.txt'), 'w') as f: f.write(f"User-agent: *\nAllow: /\nSitemap: {base_url}/sitemap.xml")
-
-    def run(self):
-        self.log("🚀 Starting VPN Generator V5.0 (SEO & Schema)...")
-        if os.path.exists(self.output_dir): 
-            try: shutil.rmtree(self.output_dir)
-            except: pass
-        os.makedirs(self.output_dir)
-        self.generate_css()
-        vpns = self.load_data()
-        if not vpns:
-            self.log("⚠️ No VPN data found. Generating placeholder.")
-            with open(os.path.join(self.output_dir, 'index.html'), 'w', encoding='utf-8') as f: f.write("<h1>Coming Soon</h1>")
-            return
-        try:
-            self.generate_index(vpns)
-            self.generate_details(vpns)
-            self.generate_legal()
-            self.generate_sitemap()
-            self.log("✅ Build Complete.")
-        except Exception as e: self.log(f"❌ BUILD FAILED: {e}")
-
-if __name__ == "__main__":
-    gen = VPNGenerator()
-    gen.run()
-
+import os
+import json
+import datetime
+import shutil
+import sys
+import base64
+import hashlib
+import argparse
+import collections
+import re
+import gzip
+from xml.sax.saxutils import escape
+import io
+import time
+import contextlib
+import functools
+import glob
+import pickle
+import multiprocessing
+import urllib.request
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from marketing_index import MarketingIndex, provider_slug
+from catalog import Provider, iter_catalog
+from search_index import SEARCH_INDEX_VERSION, searchable_fields, provider_terms, build_postings, shard_index, encode, STOPWORDS
+from minify import MINIFY_VERSION, minify_html, minify_css, normalize_review
+
+# 峰值内存统计依赖 resource（Windows 上没有，报告中记为 null）
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# 可选压缩器：安装了对应包才生成 .br / .zst，gzip 始终生成
+try:
+    import brotli
+except ImportError:
+    brotli = None
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Tiandao VPN Generator V5.0 (SEO Enhanced & Schema Markup)
+# 核心升级：适配 n8n V7.0 数据结构，注入 Google 星级评分与富文本摘要
+
+# 模板版本：修改任何页面结构/CSS 时必须递增，增量构建会据此让所有页面失效
+TEMPLATE_VERSION = "5.3.1"
+MANIFEST_NAME = ".build-manifest.json"
+# sitemap 协议限制（https://www.sitemaps.org/protocol.html）
+SITEMAP_MAX_URLS = 50000
+SITEMAP_MAX_BYTES = 50 * 1024 * 1024
+SITEMAP_HEADER = '<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+SITEMAP_FOOTER = '</urlset>'
+# 预压缩：对这些文本资源生成 .gz 等兄弟文件（gzip_static / brotli_static 风格），并写出 ETag 清单
+PRECOMPRESS_EXTENSIONS = ('.html', '.css', '.js', '.xml', '.txt', '.json', '.svg')
+ETAG_MANIFEST_NAME = "etags.json"
+# 本地 logo 缓存中可识别的文件类型（按优先级）
+LOGO_EXTENSIONS = ('.svg', '.png', '.webp', '.ico', '.jpg', '.jpeg', '.gif')
+# 缓存中没有 logo 时使用的本地占位图（首字母），保证页面不依赖第三方图片
+LOGO_PLACEHOLDER_SVG = '<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 64 64"><rect width="64" height="64" rx="32" fill="#e2e8f0"/><text x="32" y="42" font-size="28" font-family="Arial,sans-serif" font-weight="700" text-anchor="middle" fill="#475569">{initial}</text></svg>'
+# 排名页每页行数（config 的 ranking_page_size 可覆盖），JSON 分片按同样的页大小切分
+RANKING_PAGE_SIZE = 50
+RANKING_DIR = "ranking"
+# JSON 分片中每行数组的字段顺序（客户端脚本按 facets.fields 解码）
+RANKING_FIELDS = ('rank', 'slug', 'logo_url', 'provider', 'rating', 'best_for', 'streaming', 'price', 'aff_link', 'rating_value', 'price_value')
+# 站内检索：分片上限（config 的 search_shard_bytes 可覆盖）、文档信息按块存放；分词缓存放在 data/，不进入发布目录
+SEARCH_DIR = "search"
+SEARCH_SHARD_BYTES = 32 * 1024
+SEARCH_DOCS_PER_CHUNK = 1000
+# 旧版本写进 output/ 的构建缓存，增量构建复制上一次产物时去掉
+LEGACY_CACHE_NAMES = (".search-cache.pickle", ".review-cache.pickle")
+# "X vs Y" 对比页的默认选对策略（config "comparisons" 可覆盖；设为 false 关闭）：
+# 排名前 top_k 两两对比 + 同一 best_for 内前 top_k 两两对比，总数不超过 max_pages
+COMPARE_POLICY = {"top_k": 10, "same_best_for": True, "max_pages": 1000}
+# 并行渲染时每个 worker 最多排队的页面数，限制同时驻留内存的行数
+JOBS_QUEUE_DEPTH = 4
+
+# --- 模板层 ---
+# 模板在 import 时解析为「静态片段 + {{slot}}」列表；只依赖 config 的片段每次构建 bind 一次，
+# 每个页面最终只做一次 ''.join
+class Template:
+    SLOT_RE = re.compile(r'\{\{\s*(\w+)\s*\}\}')
+
+    def __init__(self, source=None, pieces=None):
+        # pieces 偶数位是静态文本，奇数位是 slot 名，长度恒为奇数
+        self.pieces = pieces if pieces is not None else self.SLOT_RE.split(source)
+        self.slots = [(i, self.pieces[i]) for i in range(1, len(self.pieces), 2)]
+
+    def bind(self, **values):
+        # 预先填充部分 slot；值为 Template 时把它的片段拼接进来（其 slot 变成外层 slot）
+        out = ['']
+        for i, piece in enumerate(self.pieces):
+            if i % 2 == 0:
+                out[-1] += piece
+            elif piece not in values:
+                out.extend((piece, ''))
+            elif isinstance(values[piece], Template):
+                sub = values[piece].pieces
+                out[-1] += sub[0]
+                out.extend(sub[1:])
+            else:
+                out[-1] += str(values[piece])
+        return Template(pieces=out)
+
+    def render(self, **values):
+        parts = list(self.pieces)
+        for i, name in self.slots: parts[i] = values[name]
+        return ''.join(parts)
+
+HEAD_TEMPLATE = Template("""<head>
+    <meta charset="UTF-8"><meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{{title}}</title><meta name="description" content="{{description}}">
+    <link rel="icon" href="{{favicon}}">
+    {{stylesheet}}
+    {{ga_script}}{{schema_html}}
+</head>""")
+
+GA_TEMPLATE = Template("""<script async src="https://www.googletagmanager.com/gtag/js?id={{ga_id}}"></script>
+    <script>window.dataLayer=window.dataLayer||[];function gtag(){dataLayer.push(arguments);}gtag('js',new Date());gtag('config','{{ga_id}}');</script>""")
+
+FOOTER_TEMPLATE = Template("""<footer>
+        <p>&copy; {{year}} {{site_name}}.</p>
+        <div class="disclosure">{{disclosure}}</div>
+        <p style="margin-top:20px;"><a href="privacy.html">{{privacy_label}}</a> • <a href="terms.html">{{t_terms}}</a></p>
+    </footer>""")
+
+EXIT_POPUP_TEMPLATE = Template("""<div class="exit-popup" id="exitPopup">
+    <div class="popup-box">
+        <span class="close-btn" onclick="closePopup()">&times;</span>
+        <div style="font-size:3rem; margin-bottom:10px;">🎁</div>
+        <h2>{{t_popup_title}}</h2>
+        <p>{{t_popup_text}}</p>
+        {{popup_cta}}
+    </div>
+</div>""")
+
+CHAMPION_TEMPLATE = Template("""
+<div class="champion-card">
+    <div class="ribbon">{{t_champion_ribbon}}</div>
+    <div style="display:flex; justify-content:space-between; align-items:center; flex-wrap:wrap; gap:20px;">
+        <div style="flex:1;">
+            <div style="display:flex; align-items:center; gap:15px; margin-bottom:10px;">
+                <img src="{{logo_url}}" width="48" height="48" alt="" style="width:48px; height:48px; border-radius:50%; box-shadow:0 2px 5px rgba(0,0,0,0.1);">
+                <h2 style="margin:0; font-size:1.8rem;">{{provider}}</h2>
+            </div>
+            <p style="margin:0; color:#64748b;">{{t_champion_tagline}}</p>
+            <div style="margin-top:15px;">
+                <span class="badge">{{t_champion_badge}}</span>
+                <span class="badge badge-green">🏆 {{best_for}}</span>
+                <span class="star-rating" style="margin-left:10px;">⭐⭐⭐⭐⭐ {{rating}}</span>
+            </div>
+        </div>
+        <div style="text-align:center; min-width:150px;">
+            <div class="price">{{price}}</div>
+            <div class="period">{{t_per_month}}</div>
+            <a href="{{aff_link}}" class="btn" style="width:100%; box-sizing:border-box; margin-top:10px; background:#ef4444;">{{t_get_deal}}</a>
+            <a href="{{slug}}" class="btn-outline">{{t_read_review}}</a>
+        </div>
+    </div>
+</div>""")
+
+INDEX_ROW_TEMPLATE = Template("""
+<tr onclick="window.location='{{slug}}'" style="cursor:pointer;">
+    <td width="5%"><div class="rank-circle {{rank_class}}">#{{rank}}</div></td>
+    <td width="30%">
+        <div style="display:flex; align-items:center; gap:12px;">
+            <img src="{{logo_url}}" width="24" height="24" alt="" style="width:24px; height:24px; border-radius:4px;">
+            <div>
+                <div style="font-weight:bold; color:#0f172a;">{{provider}}</div>
+                <div class="star-rating" style="font-size:0.8rem;">⭐⭐⭐⭐⭐ {{rating}}</div>
+            </div>
+        </div>
+    </td>
+    <td><ul style="margin:0; padding-left:15px; font-size:0.85rem; color:#64748b;">
+        <li><b>{{t_best_for}}</b> {{best_for}}</li>
+        <li>{{t_streaming}} {{streaming}}</li>
+    </ul></td>
+    <td width="15%"><div style="font-weight:800; font-size:1.1rem; color:#0f172a;">{{price}}</div></td>
+    <td width="20%">
+        <a href="{{aff_link}}" class="btn" onclick="event.stopPropagation();" target="_blank" rel="nofollow">{{t_visit_site}}</a>
+        <a href="{{slug}}" class="btn-outline" onclick="event.stopPropagation();">{{t_review}}</a>
+    </td>
+</tr>""")
+
+INDEX_TEMPLATE = Template("""<!DOCTYPE html><html lang="{{t_lang}}">
+{{head}}
+<body>
+    {{top_bar}}
+    <header>
+        <div class="container">
+            <h1>🛡️ {{site_name}}</h1>
+            <p class="subtitle">{{t_subtitle}}</p>
+            <div class="site-search" id="siteSearch" data-base="{{search_base}}" data-empty="{{t_search_empty}}" hidden>
+                <input type="search" placeholder="{{t_search_placeholder}}" aria-label="{{t_search_placeholder}}" autocomplete="off">
+                <ul class="search-results"></ul>
+            </div>
+        </div>
+    </header>
+    <div class="container" style="margin-top:-60px;">
+        {{champion_html}}
+        {{ranking_tools}}
+        <div class="card">
+            <table>
+                <thead><tr><th>{{t_th_rank}}</th><th>{{t_th_provider}}</th><th>{{t_th_verdict}}</th><th>{{t_th_price}}</th><th>{{t_th_action}}</th></tr></thead>
+                <tbody id="rankingBody">{{rows_html}}</tbody>
+            </table>
+        </div>
+        <button type="button" class="btn-outline" id="rankingMore" hidden>{{t_load_more}}</button>
+        {{pagination}}
+        {{footer}}
+    </div>
+    {{exit_popup}}
+    <template id="rankRow">{{row_template}}</template>
+    {{common_script}}
+    {{ranking_script}}
+</body></html>""")
+
+# 排序 / 过滤工具栏：无 JS 时保持隐藏，静态分页照常可用
+RANKING_TOOLS_TEMPLATE = Template("""<div class="ranking-tools" id="rankingTools" data-base="{{base}}" data-facets="{{facets_json}}" hidden>
+            <label>{{t_sort_by}} <select data-role="sort">{{sort_options}}</select></label>
+            <label>{{t_filter_by}} <select data-role="filter"><option value="">{{t_filter_all}}</option>{{filter_options}}</select></label>
+        </div>""")
+
+PAGINATION_TEMPLATE = Template("""<nav class="pagination">{{prev_link}}<span>{{t_page_of}}</span>{{next_link}}</nav>""")
+
+PROS_CONS_TEMPLATE = Template("""
+<div class="pros-cons">
+    <div class="pros"><h3>{{t_pros_title}}</h3>{{pros_html}}</div>
+    <div class="cons"><h3>{{t_cons_title}}</h3>{{cons_html}}</div>
+</div>
+""")
+
+DETAIL_TEMPLATE = Template("""<!DOCTYPE html><html lang="{{t_lang}}">
+{{head}}
+<body>
+    <div class="top-bar" onclick="topBarClick()">{{t_detail_top_bar}}</div>
+    <div class="container" style="margin-top:20px;">
+        <div class="breadcrumbs">
+            <a href="index.html">{{t_home}}</a> <span>/</span> {{t_reviews}} <span>/</span> {{provider}}
+        </div>
+        <div class="card" style="padding:40px; text-align:center;">
+            <img src="{{logo_url}}" width="64" height="64" alt="" style="width:64px; height:64px; border-radius:50%; margin-bottom:20px; box-shadow:0 4px 10px rgba(0,0,0,0.1);">
+            <h1 style="margin:0;">{{t_review_title}}</h1>
+            <div class="star-rating" style="margin:10px 0; font-size:1.2rem;">⭐⭐⭐⭐⭐ {{rating}}/5.0</div>
+            <a href="{{aff_link}}" class="btn" style="margin-top:20px; font-size:1.1rem; padding:15px 30px;" target="_blank" rel="nofollow">{{t_get_offer}}</a>
+        </div>
+
+        <div class="card" style="margin-top:20px; padding:40px;">
+            {{pros_cons_box}}
+            <div style="max-width:800px; margin:20px auto; line-height:1.8;">
+                {{long_review}}
+            </div>
+        </div>
+
+        {{footer}}
+    </div>
+    {{exit_popup}}
+    {{common_script}}
+</body></html>""")
+
+# 单个 Provider 的规格卡片：每次构建只渲染一次，在它参与的所有对比页中复用
+COMPARE_SPEC_TEMPLATE = Template("""
+<div class="card compare-spec">
+    <img src="{{logo_url}}" width="48" height="48" alt="" style="width:48px; height:48px; border-radius:50%;">
+    <h2><a href="{{slug}}">{{provider}}</a></h2>
+    <dl>
+        <dt>{{t_spec_rating}}</dt><dd class="star-rating">⭐ {{rating}}/5.0</dd>
+        <dt>{{t_spec_price}}</dt><dd>{{price}}</dd>
+        <dt>{{t_spec_servers}}</dt><dd>{{servers}}</dd>
+        <dt>{{t_spec_no_logs}}</dt><dd>{{no_logs}}</dd>
+        <dt>{{t_spec_streaming}}</dt><dd>{{streaming}}</dd>
+        <dt>{{t_spec_money_back}}</dt><dd>{{money_back}}</dd>
+    </dl>
+    <a href="{{aff_link}}" class="btn" target="_blank" rel="nofollow">{{t_visit_site}}</a>
+</div>""")
+
+COMPARE_TEMPLATE = Template("""<!DOCTYPE html><html lang="{{t_lang}}">
+{{head}}
+<body>
+    <div class="container" style="margin-top:20px;">
+        <div class="breadcrumbs">
+            <a href="index.html">{{t_home}}</a> <span>/</span> {{t_compare}} <span>/</span> {{provider_a}} vs {{provider_b}}
+        </div>
+        <div class="card" style="padding:40px; text-align:center;">
+            <h1 style="margin:0;">{{t_compare_heading}}</h1>
+            {{verdict}}
+        </div>
+        <div class="compare-grid">{{spec_a}}{{spec_b}}</div>
+        {{footer}}
+    </div>
+</body></html>""")
+
+LEGAL_TEMPLATE = Template("""<!DOCTYPE html><html lang="{{t_lang}}">
+{{head}}
+<body>
+    <div class="container">
+        <header style="padding:40px; margin-bottom:20px;"><h1>{{title}}</h1></header>
+        <div class="card legal-content" style="padding:40px;">{{content}}</div>
+        <footer><p><a href="index.html">{{t_back_home}}</a></p></footer>
+    </div>
+</body></html>""")
+
+POST_HISTORY_TEMPLATE = Template("""<!DOCTYPE html><html lang="{{t_lang}}">
+{{head}}
+<body>
+    <div class="container" style="margin-top:20px;">
+        <div class="breadcrumbs">
+            <a href="index.html">{{t_home}}</a> <span>/</span> <a href="{{review_slug}}">{{provider}}</a> <span>/</span> {{t_post_history}}
+        </div>
+        <div class="card" style="padding:40px;">
+            <h1 style="margin:0 0 10px 0;">{{t_post_history_title}}</h1>
+            <p style="margin:0; color:#64748b;">{{t_post_count}}</p>
+        </div>
+        {{posts_html}}
+        {{footer}}
+    </div>
+</body></html>""")
+
+POST_ITEM_TEMPLATE = Template("""
+<div class="card" style="padding:20px 30px;">
+    <div style="font-size:0.85rem; color:#64748b;">{{posted_at}} {{duplicate_badge}}</div>
+    <p style="margin:10px 0 0 0;">{{body}}</p>
+</div>""")
+
+# 页面文案（模板中的 {{t_<key>}}）；站点配置的 "locale" 可覆盖任意一项。值可以包含 {{provider}} / {{year}}
+DEFAULT_LOCALE = {
+    "lang": "en",
+    "index_title": "Best VPNs for {{year}} - Speed & Privacy Tested",
+    "index_description": "Compare top VPNs used by experts. Find the fastest, most secure VPN for streaming and gaming.",
+    "subtitle": "Trusted by 2M+ users. We tested 50+ VPNs for speed & security.",
+    "th_rank": "Rank", "th_provider": "Provider", "th_verdict": "Verdict", "th_price": "Price", "th_action": "Action",
+    "champion_ribbon": "🏆 #1 RANKED",
+    "champion_tagline": "The best overall VPN for speed, security, and streaming in 2026.",
+    "champion_badge": "🚀 Fastest",
+    "per_month": "per month",
+    "get_deal": "Get Deal &rarr;",
+    "read_review": "📖 Read Review",
+    "best_for": "Best For:",
+    "streaming": "Streaming:",
+    "visit_site": "Visit Site",
+    "review": "Review",
+    "detail_top_bar": "🔥 Limited Time: Get 68% OFF {{provider}}!",
+    "home": "Home",
+    "reviews": "Reviews",
+    "review_title": "{{provider}} Review",
+    "get_offer": "Get 68% OFF {{provider}} &rarr;",
+    "pros_title": "What We Like",
+    "cons_title": "What Could Be Better",
+    "popup_title": "Wait! Don't Overpay.",
+    "popup_text": "We found a secret <strong>68% OFF</strong> deal.",
+    "claim_discount": "Claim Discount",
+    "ranking_title": "Best VPNs for {{year}} - Page {{page}}",
+    "sort_by": "Sort by",
+    "sort_rank": "Our Ranking",
+    "sort_rating": "Highest Rated",
+    "sort_price": "Lowest Price",
+    "filter_by": "Show",
+    "filter_all": "All Providers",
+    "filter_best_for": "Best For",
+    "filter_streaming": "Streaming",
+    "load_more": "Load More",
+    "search_placeholder": "Search VPNs, features, streaming services...",
+    "search_empty": "No matches found",
+    "prev_page": "&larr; Previous",
+    "next_page": "Next &rarr;",
+    "page_of": "Page {{page}} of {{pages}}",
+    "compare": "Compare",
+    "compare_title": "{{provider_a}} vs {{provider_b}} ({{year}}): Which VPN Is Better?",
+    "compare_description": "{{provider_a}} vs {{provider_b}}: price, servers, logging policy, streaming and refund terms side by side.",
+    "compare_heading": "{{provider_a}} vs {{provider_b}}",
+    "compare_rated_higher": "{{provider}} is rated higher ({{rating}}/5.0).",
+    "compare_same_rating": "Both are rated {{rating}}/5.0.",
+    "compare_cheaper": "{{provider}} is cheaper at {{price}}.",
+    "spec_rating": "Rating",
+    "spec_price": "Price",
+    "spec_servers": "Servers",
+    "spec_no_logs": "No-Logs",
+    "spec_streaming": "Streaming",
+    "spec_money_back": "Money-Back",
+    "privacy_policy": "Privacy Policy",
+    "privacy": "Privacy",
+    "terms": "Terms",
+    "back_home": "Back to Home",
+    "privacy_title": "Privacy Policy",
+    "privacy_content": "<p>Your privacy is important to us. We use Google Analytics to improve user experience.</p>",
+    "terms_title": "Terms Policy",
+    "terms_content": "<p>By using this site, you agree to our terms.</p>",
+    "post_history": "Post History",
+    "post_history_title": "{{provider}} Post History",
+    "post_history_description": "Social posts published for {{provider}}.",
+    "post_count": "{{post_count}} posts, {{unique_count}} unique",
+    "near_duplicate": "Near-duplicate",
+}
+
+COMMON_JS = """function triggerExitPopup() {
+    if (localStorage.getItem('hasSeenExitPopup') === 'yes') return;
+    var popup = document.getElementById('exitPopup');
+    if (popup) {
+        popup.style.display = 'flex';
+        localStorage.setItem('hasSeenExitPopup', 'yes');
+    }
+}
+document.addEventListener('mouseleave', function(e) {
+    if (e.clientY < 0) triggerExitPopup();
+});
+function closePopup() { document.getElementById('exitPopup').style.display = 'none'; }
+function topBarClick() { triggerExitPopup(); }
+"""
+
+# 站内检索客户端：首次输入时取 meta.json，之后只请求查询词前缀对应的分片与结果所在的文档块
+SEARCH_JS = """(function() {
+    var box = document.getElementById('siteSearch');
+    if (!box || !window.fetch) return;
+    var base = box.getAttribute('data-base');
+    var input = box.querySelector('input');
+    var list = box.querySelector('.search-results');
+    var meta = null, shards = {}, chunks = {}, timer = null;
+    function load(path) { return fetch(base + path).then(function(r) { return r.json(); }); }
+    function shard(i) { return shards[i] || (shards[i] = load('shard-' + i + '.json')); }
+    function chunk(i) { return chunks[i] || (chunks[i] = load('docs-' + i + '.json')); }
+    function tokens(text) { return (text.toLowerCase().match(/[\\p{L}\\p{N}_]+/gu) || []).filter(function(t) { return t.length > 1; }); }
+    function show(query, docs, infos) {
+        if (input.value !== query) return;
+        list.innerHTML = '';
+        docs.forEach(function(doc, i) {
+            var info = infos[i][doc % meta.chunk], li = document.createElement('li'), a = document.createElement('a'), note = document.createElement('span');
+            a.href = info[0];
+            a.textContent = info[1];
+            note.textContent = '\u2b50 ' + info[2] + ' \u00b7 ' + info[3];
+            li.appendChild(a);
+            li.appendChild(note);
+            list.appendChild(li);
+        });
+        if (!docs.length && query.trim()) {
+            var empty = document.createElement('li');
+            empty.textContent = box.getAttribute('data-empty');
+            list.appendChild(empty);
+        }
+    }
+    function search(query) {
+        var words = tokens(query);
+        if (!words.length) return show(query, [], []);
+        (meta ? Promise.resolve(meta) : load('meta.json')).then(function(m) {
+            meta = m;
+            words = words.filter(function(w) { return m.stop.indexOf(w) < 0; });
+            var needed = [];
+            Object.keys(m.shards).forEach(function(prefix) {
+                var hit = words.some(function(w) { return prefix.indexOf(w) === 0 || w.indexOf(prefix) === 0; });
+                if (hit && needed.indexOf(m.shards[prefix]) < 0) needed.push(m.shards[prefix]);
+            });
+            return Promise.all(needed.map(shard));
+        }).then(function(indexes) {
+            // 每个词取前缀匹配的最高分（完整匹配权重更高），多个词取交集后求和
+            var totals = null;
+            words.forEach(function(word) {
+                var scores = {};
+                indexes.forEach(function(index) {
+                    Object.keys(index).forEach(function(term) {
+                        if (term.indexOf(word) !== 0) return;
+                        var postings = index[term], idf = Math.log(1 + meta.docs * 2 / postings.length), boost = term === word ? 1 : 0.5;
+                        for (var i = 0; i < postings.length; i += 2) scores[postings[i]] = Math.max(scores[postings[i]] || 0, postings[i + 1] * idf * boost);
+                    });
+                });
+                if (totals === null) { totals = scores; return; }
+                Object.keys(totals).forEach(function(doc) { if (doc in scores) totals[doc] += scores[doc]; else delete totals[doc]; });
+            });
+            var docs = Object.keys(totals || {}).sort(function(a, b) { return totals[b] - totals[a]; }).slice(0, 8).map(Number);
+            return Promise.all(docs.map(function(doc) { return chunk(Math.floor(doc / meta.chunk)); })).then(function(infos) { show(query, docs, infos); });
+        }).catch(function() {});
+    }
+    input.addEventListener('input', function() {
+        clearTimeout(timer);
+        timer = setTimeout(function() { search(input.value); }, 150);
+    });
+    box.hidden = false;
+})();
+"""
+
+# 排名页客户端：切换排序 / 过滤时只请求对应分片的下一页；过滤 + 非默认排序时取齐该过滤分片后在本地排序
+RANKING_JS = """(function() {
+    var tools = document.getElementById('rankingTools');
+    if (!tools || !window.fetch) return;
+    var meta = JSON.parse(tools.getAttribute('data-facets'));
+    var base = tools.getAttribute('data-base');
+    var body = document.getElementById('rankingBody');
+    var more = document.getElementById('rankingMore');
+    var pager = document.querySelector('.pagination');
+    var template = document.getElementById('rankRow').innerHTML;
+    var sortSelect = tools.querySelector('[data-role="sort"]');
+    var filterSelect = tools.querySelector('[data-role="filter"]');
+    var view = null;
+    function field(name) { return meta.fields.indexOf(name); }
+    function renderRow(values) {
+        var row = {};
+        meta.fields.forEach(function(name, i) { row[name] = values[i]; });
+        row.rank_class = row.rank === 1 ? 'rank-1' : '';
+        return template.replace(/@@(\\w+)@@/g, function(m, key) { return row[key] == null ? '' : row[key]; });
+    }
+    function compare(sort) {
+        var key = field(sort === 'rating' ? 'rating_value' : sort === 'price' ? 'price_value' : 'rank');
+        var rank = field('rank'), dir = sort === 'rating' ? -1 : 1;
+        return function(a, b) {
+            if (a[key] === b[key]) return a[rank] - b[rank];
+            if (a[key] === null) return 1;
+            if (b[key] === null) return -1;
+            return (a[key] - b[key]) * dir;
+        };
+    }
+    function show() {
+        var rows = view.localSort ? view.rows.slice().sort(compare(view.sort)) : view.rows;
+        body.innerHTML = rows.map(renderRow).join('');
+        more.hidden = view.loaded >= view.pages;
+    }
+    function load() {
+        var current = view;
+        return fetch(base + current.shard + '-' + (current.loaded + 1) + '.json').then(function(r) { return r.json(); }).then(function(rows) {
+            if (view !== current) return;
+            current.rows = current.rows.concat(rows);
+            current.loaded++;
+            if (current.localSort && current.loaded < current.pages) return load();
+            show();
+        });
+    }
+    function update() {
+        var filter = filterSelect.value, sort = sortSelect.value, shard = filter || 'sort-' + sort;
+        view = {shard: shard, sort: sort, localSort: !!filter && sort !== 'rank', rows: [], loaded: 0, pages: meta.shards[shard]};
+        if (pager) pager.hidden = true;
+        load();
+    }
+    sortSelect.addEventListener('change', update);
+    filterSelect.addEventListener('change', update);
+    more.addEventListener('click', load);
+    tools.hidden = false;
+})();
+"""
+
+SITE_CSS = """:root { --primary: #2563eb; --secondary: #1e40af; --accent: #ef4444; --bg: #f8fafc; --text: #1e293b; --star: #f59e0b; }
+body { font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, Helvetica, Arial, sans-serif; background: var(--bg); color: var(--text); margin: 0; line-height: 1.6; display: flex; flex-direction: column; min-height: 100vh; }
+.container { max-width: 1100px; margin: 0 auto; padding: 20px; width: 100%; box-sizing: border-box; flex: 1; }
+
+/* Top Bar */
+.top-bar { position: sticky; top: 0; z-index: 9000; background: var(--accent); color: white; text-align: center; padding: 12px; font-weight: 700; font-size: 14px; cursor: pointer; transition: background 0.2s; user-select: none; box-shadow: 0 2px 5px rgba(0,0,0,0.1); }
+.top-bar:hover { background: #dc2626; text-decoration: underline; }
+
+/* Headers */
+header { text-align: center; padding: 60px 20px; background: linear-gradient(135deg, #1e293b 0%, #0f172a 100%); color: white; border-radius: 0 0 20px 20px; margin-bottom: 40px; }
+h1 { font-size: 2.5rem; margin: 0 0 15px 0; letter-spacing: -1px; }
+.subtitle { font-size: 1.2rem; color: #94a3b8; max-width: 600px; margin: 0 auto; }
+
+/* Champion Card */
+.champion-card { background: white; border: 2px solid var(--primary); border-radius: 16px; padding: 30px; margin-bottom: 40px; box-shadow: 0 10px 25px -5px rgba(37, 99, 235, 0.2); position: relative; overflow: hidden; }
+.ribbon { position: absolute; top: 0; right: 0; background: var(--primary); color: white; padding: 8px 15px; border-bottom-left-radius: 12px; font-weight: bold; font-size: 0.9rem; }
+
+/* Tables */
+.card { background: white; border-radius: 12px; box-shadow: 0 4px 6px -1px rgba(0,0,0,0.05); border: 1px solid #e2e8f0; overflow: hidden; margin-bottom: 20px; }
+table { width: 100%; border-collapse: collapse; }
+th { text-align: left; padding: 18px; background: #f8fafc; color: #64748b; font-size: 0.85rem; text-transform: uppercase; border-bottom: 1px solid #e2e8f0; }
+td { padding: 20px 18px; border-bottom: 1px solid #f1f5f9; vertical-align: middle; }
+tr:hover { background-color: #f8fafc; }
+
+/* New Elements (Stars & Badges) */
+.star-rating { color: var(--star); font-weight: 800; letter-spacing: 1px; white-space: nowrap; }
+.rank-circle { width: 32px; height: 32px; background: #f1f5f9; border-radius: 50%; display: flex; align-items: center; justify-content: center; font-weight: 800; color: #94a3b8; }
+.rank-1 { background: #fef3c7; color: #d97706; border: 2px solid #fcd34d; }
+.badge { background: #dbeafe; color: var(--primary); padding: 4px 10px; border-radius: 20px; font-size: 0.75rem; font-weight: 700; text-transform: uppercase; white-space: nowrap; display: inline-block; margin-top: 5px; }
+.badge-green { background: #dcfce7; color: #166534; }
+
+/* Pros & Cons Box */
+.pros-cons { display: grid; grid-template-columns: 1fr 1fr; gap: 20px; margin-top: 30px; background: #f8fafc; padding: 20px; border-radius: 12px; }
+.pros h3 { color: #166534; margin-top: 0; font-size: 1.1rem; }
+.cons h3 { color: #991b1b; margin-top: 0; font-size: 1.1rem; }
+.pro-item, .con-item { margin-bottom: 8px; font-size: 0.95rem; }
+.pro-item:before { content: "✅ "; }
+.con-item:before { content: "❌ "; }
+
+/* Buttons */
+.btn { display: inline-block; background: var(--primary); color: white; padding: 12px 24px; border-radius: 8px; text-decoration: none; font-weight: 700; transition: 0.2s; white-space: nowrap; text-align: center; cursor: pointer; }
+.btn:hover { background: var(--secondary); transform: translateY(-1px); box-shadow: 0 4px 12px rgba(37, 99, 235, 0.3); }
+.btn-outline { color: #475569; text-decoration: none; font-size: 0.9rem; margin-top: 10px; display: inline-block; border: 1px solid #cbd5e1; padding: 8px 16px; border-radius: 6px; transition: 0.2s; background: white; cursor: pointer; }
+.btn-outline:hover { border-color: var(--primary); color: var(--primary); background: #eff6ff; }
+
+.breadcrumbs { font-size: 0.9rem; color: #64748b; margin-bottom: 20px; }
+.breadcrumbs a { color: var(--primary); text-decoration: none; }
+.breadcrumbs span { margin: 0 8px; color: #cbd5e1; }
+
+/* Mobile */
+@media (max-width: 768px) {
+    header { padding: 30px 20px; }
+    h1 { font-size: 1.8rem; }
+    thead { display: none; }
+    tr { display: flex; flex-direction: column; padding: 20px; border-bottom: 8px solid #f8fafc; }
+    td { padding: 5px 0; border: none; }
+    .pros-cons { grid-template-columns: 1fr; }
+    .compare-grid { grid-template-columns: 1fr; }
+    .btn, .btn-outline { display: block; width: 100%; margin-top: 10px; box-sizing: border-box; }
+}
+
+footer { text-align: center; margin-top: auto; color: #94a3b8; font-size: 0.9rem; padding: 40px 0; background: #fff; border-top: 1px solid #f1f5f9; }
+.disclosure { background: #fffbeb; color: #92400e; padding: 12px; font-size: 0.85rem; border-radius: 8px; display: inline-block; margin-top: 20px; max-width: 600px; }
+
+.exit-popup { display: none; position: fixed; top: 0; left: 0; width: 100%; height: 100%; background: rgba(0,0,0,0.8); z-index: 99999; justify-content: center; align-items: center; backdrop-filter: blur(5px); }
+.popup-box { background: white; padding: 40px; border-radius: 16px; text-align: center; max-width: 400px; position: relative; animation: popIn 0.3s ease; }
+@keyframes popIn { from {transform: scale(0.9); opacity: 0;} to {transform: scale(1); opacity: 1;} }
+.close-btn { position: absolute; top: 15px; right: 20px; cursor: pointer; font-size: 24px; color: #cbd5e1; }
+
+/* Ranking: sort / filter tools & pagination */
+[hidden] { display: none !important; }
+.ranking-tools { display: flex; flex-wrap: wrap; gap: 15px; justify-content: flex-end; margin-bottom: 15px; font-size: 0.9rem; color: #64748b; }
+.ranking-tools select { margin-left: 6px; padding: 6px 10px; border: 1px solid #cbd5e1; border-radius: 6px; background: white; color: var(--text); }
+.pagination { display: flex; justify-content: space-between; align-items: center; margin: 10px 0 20px; color: #64748b; }
+
+/* X vs Y comparison */
+.compare-grid { display: grid; grid-template-columns: 1fr 1fr; gap: 20px; }
+.compare-spec { padding: 30px; text-align: center; margin-bottom: 0; }
+.compare-spec h2 { margin: 10px 0 20px; }
+.compare-spec h2 a { color: var(--text); text-decoration: none; }
+.compare-spec dl { display: grid; grid-template-columns: auto 1fr; gap: 10px 20px; margin: 0 0 25px; text-align: left; }
+.compare-spec dt { color: #64748b; font-weight: 600; }
+.compare-spec dd { margin: 0; }
+.compare-verdict { margin: 15px 0 0; color: #475569; }
+
+/* Site search */
+.site-search { position: relative; max-width: 420px; margin: 25px auto 0; }
+.site-search input { width: 100%; box-sizing: border-box; padding: 12px 16px; border: none; border-radius: 8px; font-size: 1rem; }
+.search-results { position: absolute; left: 0; right: 0; top: 100%; z-index: 100; margin: 6px 0 0; padding: 0; list-style: none; background: white; border-radius: 8px; box-shadow: 0 10px 25px rgba(0,0,0,0.15); text-align: left; }
+.search-results:empty { display: none; }
+.search-results li { display: flex; justify-content: space-between; gap: 10px; padding: 10px 16px; border-bottom: 1px solid #f1f5f9; }
+.search-results a { color: var(--text); font-weight: 700; text-decoration: none; }
+.search-results span { color: #64748b; font-size: 0.85rem; white-space: nowrap; }
+"""
+
+# 输出到 static/ 的资源（文件名由 get_asset_url 加指纹）
+STATIC_ASSETS = {"style.css": SITE_CSS, "app.js": COMMON_JS, "ranking.js": RANKING_JS, "search.js": SEARCH_JS}
+
+# 首屏（冠军卡片 + 排名表顶部）用到的选择器，--inline-critical-css 时只内联这些规则
+CRITICAL_SELECTORS = {
+    ':root', 'body', '.container', '.top-bar', 'header', 'h1', 'h2', '.subtitle', '.champion-card', '.ribbon',
+    '.card', 'table', 'thead', 'th', 'td', 'tr', '.star-rating', '.rank-circle', '.rank-1', '.badge',
+    '.badge-green', '.btn', '.btn-outline',
+    # 弹窗默认 display:none，必须内联，否则异步样式表加载前会闪现
+    '.exit-popup',
+    # 工具栏在无 JS 时依赖 [hidden] 隐藏
+    '[hidden]', '.ranking-tools', 'select', '.site-search', 'input',
+}
+
+FAVICON_DATA_URI = "data:image/svg+xml,<svg xmlns=%22http://www.w3.org/2000/svg%22 viewBox=%220 0 100 100%22><text y=%22.9em%22 font-size=%2290%22>🛡️</text></svg>"
+
+# --- 联盟链接解析 ---
+# 按「归一化 key 长度 → key 集合」建索引：对 Provider 名只枚举这些长度的子串做哈希查找，
+# 从最长的长度开始，命中即返回，因此重叠的 key（如 "Proton" 与 "Proton VPN"）总是最长者优先
+class AffiliateResolver:
+    def __init__(self, affiliate_map):
+        self.index = {}
+        for key, link in affiliate_map.items():
+            name = str(key).strip().lower()
+            # 空链接与原逻辑一致：视为未配置；同名 key 保留 config 中先出现的
+            if name and link and name not in self.index: self.index[name] = link
+        self.lengths = sorted({len(name) for name in self.index}, reverse=True)
+        self.cache = {}
+
+    def resolve(self, provider):
+        clean_name = str(provider).strip().lower()
+        if clean_name in self.cache: return self.cache[clean_name]
+        link = None
+        for length in self.lengths:
+            if length > len(clean_name): continue
+            for start in range(len(clean_name) - length + 1):
+                link = self.index.get(clean_name[start:start + length])
+                if link: break
+            if link: break
+        self.cache[clean_name] = link
+        return link
+
+def split_css_rules(css):
+    # 只做规则级切分：返回 [(prelude, block), ...]，block 内可嵌套（@media）
+    rules, pos = [], 0
+    while True:
+        open_at = css.find('{', pos)
+        if open_at < 0: return rules
+        depth, i = 1, open_at + 1
+        while depth:
+            if css[i] == '{': depth += 1
+            elif css[i] == '}': depth -= 1
+            i += 1
+        rules.append((css[pos:open_at].strip(), css[open_at + 1:i - 1].strip()))
+        pos = i
+
+def is_critical_selector(selector, critical):
+    # 复合选择器的每一段（去掉 :hover 等伪类）都在首屏集合中才算关键规则
+    parts = [re.sub(r'(?<=.)::?[\w-]+(\(.*?\))?$', '', part) for part in selector.split()]
+    return all(part in critical for part in parts)
+
+def extract_critical_css(css, critical):
+    out = []
+    for prelude, block in split_css_rules(re.sub(r'/\*.*?\*/', '', css, flags=re.S)):
+        if prelude.startswith('@media'):
+            inner = extract_critical_css(block, critical)
+            if inner: out.append(f"{prelude}{{{inner}}}")
+        elif not prelude.startswith('@') and any(is_critical_selector(s.strip(), critical) for s in prelude.split(',')):
+            out.append(f"{prelude}{{{block}}}")
+    return "".join(out)
+
+# 与站点配置无关的资源指纹与首屏 CSS：进程内只计算一次（多站点构建时各站点共享）
+@functools.lru_cache(maxsize=None)
+def asset_content(name, minify=False):
+    return minify_css(STATIC_ASSETS[name]) if minify and name.endswith('.css') else STATIC_ASSETS[name]
+
+@functools.lru_cache(maxsize=None)
+def asset_url(name, minify=False):
+    # 静态资源文件名带内容指纹（style.css -> style.<sha10>.css），可设置长期缓存；压缩后的内容指纹不同
+    base, ext = os.path.splitext(name)
+    digest = hashlib.sha256(asset_content(name, minify).encode('utf-8')).hexdigest()[:10]
+    return f"/static/{base}.{digest}{ext}"
+
+@functools.lru_cache(maxsize=None)
+def critical_css(minify=False):
+    css = extract_critical_css(SITE_CSS, CRITICAL_SELECTORS)
+    return minify_css(css) if minify else css
+
+def fetch_google_favicon(domain):
+    # 默认 logo fetcher：命令行构建默认开启（--no-fetch-logos 关闭），只对 data/logos/ 中缺失的域名调用，结果写入本地缓存，
+    # 之后的构建直接读缓存
+    url = f"https://www.google.com/s2/favicons?domain={domain}&sz=128"
+    with urllib.request.urlopen(url, timeout=10) as resp:
+        return resp.read(), '.png'
+
+def peak_rss_kb():
+    # ru_maxrss 在 Linux 上是 KB、macOS 上是字节；RUSAGE_CHILDREN 覆盖已退出的 --jobs worker
+    if resource is None: return None, None
+    scale = 1024 if sys.platform == 'darwin' else 1
+    return (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // scale,
+            resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss // scale)
+
+def gzip_bytes(data):
+    # mtime=0：相同输入得到相同字节（gzip.compress 的 mtime 参数要 3.8+）
+    buf = io.BytesIO()
+    with gzip.GzipFile(filename='', mode='wb', fileobj=buf, compresslevel=9, mtime=0) as f: f.write(data)
+    return buf.getvalue()
+
+def get_encoders():
+    encoders = [('gzip', '.gz', gzip_bytes)]
+    if brotli is not None: encoders.append(('br', '.br', lambda data: brotli.compress(data, quality=11)))
+    if zstandard is not None: encoders.append(('zstd', '.zst', zstandard.ZstdCompressor(level=19).compress))
+    return encoders
+
+# 子进程中持有的生成器副本（通过 initializer 只传递一次，避免每个任务都 pickle 整个实例）
+_WORKER_GEN = None
+
+def _init_worker(gen):
+    global _WORKER_GEN
+    _WORKER_GEN = gen
+
+def _write_detail_worker(task):
+    return _WORKER_GEN.write_detail(*task)
+
+class VPNGenerator:
+    def __init__(self, incremental=False, jobs=1, precompress=False, logo_fetcher=None, inline_critical_css=False, base_dir=None, profile_path=None, post_history=False,
+                 site=None, catalog=None, logo_data=None, minify=False):
+        self.base_dir = base_dir or os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        # 多站点构建（--sites）：site 覆盖 config 字段并使用自己的输出目录；catalog / logo_data 由各站点共享
+        self.site = site or {}
+        self.site_id = self.site.get('id')
+        self.catalog = catalog
+        self.logo_data = logo_data if logo_data is not None else {}
+        self.data_path = os.path.join(self.base_dir, 'data', 'vpn_raw.csv')
+        # 解析后的目录缓存（见 catalog.py），CSV 不变时跳过重新解析
+        self.catalog_cache_path = self.data_path + '.cache'
+        # 站内检索的分词缓存（仅增量构建使用）；多站点并发构建时各站点一份
+        cache_suffix = f"-{self.site_id}" if self.site_id else ""
+        self.search_cache_path = os.path.join(self.base_dir, 'data', f"search-cache{cache_suffix}.pickle")
+        # --minify：Long_Review 规范化结果按正文哈希缓存，正文未变的评测不再重新解析
+        self.review_cache_path = os.path.join(self.base_dir, 'data', f"review-cache{cache_suffix}.pickle")
+        self.config_path = os.path.join(self.base_dir, 'config.json')
+        self.output_dir = os.path.join(self.base_dir, self.site.get('output_dir') or (f"output-{self.site_id}" if self.site_id else 'output'))
+        self.static_dir = os.path.join(self.base_dir, 'static')
+        self.logo_cache_dir = os.path.join(self.base_dir, 'data', 'logos')
+        # 所有页面先写入 staging 目录，构建成功后改名为 output.build-<时间戳>/，再把 output 符号链接原子地指向它
+        self.build_dir = self.output_dir + '.staging'
+        self.incremental = incremental
+        self.jobs = max(1, jobs)
+        self.precompress = precompress
+        self.inline_critical_css = inline_critical_css
+        self.post_history = post_history
+        self.minify = minify
+        # --minify：页面名 -> [压缩前字节, 写入字节]；正文哈希 -> 规范化后的 Long_Review（与原文相同时为 None）
+        self.minify_report = {}
+        self.review_cache, self.review_keys = {}, set()
+        # fetcher(domain) -> (bytes, ext) 或 None；为 None 时只使用本地缓存
+        self.logo_fetcher = logo_fetcher
+        self.logo_urls = {}
+        self.placeholder_logos = []
+        self.failed_pages = []
+        self._templates = None
+        self._affiliate_resolver = None
+        self.generated_urls = []
+        # 第 2..N 页排名页（generate_index 填充，进入 sitemap）
+        self.ranking_pages = []
+        # "X vs Y" 对比页（generate_comparisons 填充，进入 sitemap 与 manifest）
+        self.compare_pages = []
+        # pages: 输入哈希（决定是否重新渲染）；content: 产物哈希与 lastmod（供 sitemap 使用）
+        self.prev_manifest = {"template_version": None, "pages": {}, "content": {}}
+        self.manifest = {"template_version": TEMPLATE_VERSION, "pages": {}, "content": {}}
+        self.build_time = datetime.datetime.now(datetime.timezone.utc).replace(microsecond=0).isoformat()
+        self.stats = {"written": 0, "skipped": 0, "removed": 0, "compressed": 0, "bytes": 0}
+        # 构建埋点：hook(event, data)，event 为 stage_start / stage_end / build_end；只在主进程调用，不传给 --jobs 子进程
+        self.hooks = []
+        self.profile = {"stages": []}
+        self.profile_path = profile_path
+        self.config = self.load_config()
+        self.locale = dict(DEFAULT_LOCALE, **self.config.get('locale', {}))
+
+        # VPN 域名修正字典
+        self.domain_map = {
+            "Private Internet Access": "privateinternetaccess.com",
+            "PIA": "privateinternetaccess.com",
+            "PureVPN": "purevpn.com",
+            "IPVanish": "ipvanish.com",
+            "ProtonVPN": "protonvpn.com",
+            "Windscribe": "windscribe.com",
+            "TunnelBear": "tunnelbear.com",
+            "Hide.me": "hide.me",
+            "Mullvad": "mullvad.net",
+            "Atlas VPN": "atlasvpn.com",
+            "StrongVPN": "strongvpn.com",
+            "PrivadoVPN": "privadovpn.com",
+            "NordVPN": "nordvpn.com",
+            "ExpressVPN": "expressvpn.com",
+            "Surfshark": "surfshark.com",
+            "CyberGhost": "cyberghostvpn.com"
+        }
+
+    def log(self, message):
+        print(f"[VPN-GEN:{self.site_id}] {message}" if self.site_id else f"[VPN-GEN] {message}")
+
+    def __getstate__(self):
+        # 传给 --jobs 子进程（spawn，需要 pickle）时只带渲染详情页用到的状态：子进程只渲染收到的行。
+        # 构建埋点与 logo fetcher 留在主进程（可能是 lambda / 闭包）；logo 在进程池启动前已全部准备好，
+        # 清单、缓存与统计由主进程汇总
+        state = dict(self.__dict__)
+        state.update(catalog=None, hooks=[], logo_fetcher=None, logo_data={}, review_cache={}, review_keys=set(),
+                     minify_report={}, failed_pages=[], generated_urls=[], ranking_pages=[], compare_pages=[], placeholder_logos=[],
+                     profile={"stages": []})
+        for key in ('prev_manifest', 'manifest'):
+            state[key] = {"template_version": self.manifest['template_version'], "pages": {}, "content": {}}
+        return state
+
+    def load_config(self):
+        config = {
+            "site_name": "Privacy Shield VPN",
+            "domain": "https://vpn.ii-x.com",
+            "year": "2026",
+            "google_analytics_id": "",
+            "affiliate_map": {}, 
+            "top_bar": {"enabled": True, "text": "🔥 Limited Time: Get 68% OFF Top VPNs!", "link": "#ranking"},
+            "legal": {"disclosure": "Advertiser Disclosure: We are reader-supported. We may receive a commission for purchases made through these links."}
+        }
+        if os.path.exists(self.config_path):
+            try:
+                with open(self.config_path, 'r', encoding='utf-8') as f:
+                    loaded = json.load(f)
+                    config.update(loaded)
+                self.log("✅ Config loaded.")
+            except: pass
+        # 多站点构建：站点条目覆盖 config.json 中的同名字段（domain、site_name、affiliate_map、locale…）
+        config.update({k: v for k, v in self.site.items() if k not in ('id', 'output_dir')})
+        return config
+
+    def iter_rows(self):
+        # 流式读取 Provider 记录：一次只持有一行（含 Long_Review 大字段）；多站点构建时读共享的已解析目录
+        if self.catalog is not None: return iter(self.catalog)
+        return iter_catalog(self.data_path, self.catalog_cache_path)
+
+    def load_index_rows(self):
+        # 首页只需要排名相关的轻量字段，不保留评测正文。
+        # 读取/解析错误直接抛给 run()：丢弃 staging、保留线上旧站，而不是发布占位页并把所有页面当作孤儿删除
+        self.log(f"📂 Loading data from {self.data_path}...")
+        data = [vpn.without_review() for vpn in self.iter_rows()]
+        self.log(f"✅ Loaded {len(data)} VPNs.")
+        return data
+
+    # --- 增量构建：输入哈希清单 ---
+    def hash_inputs(self, inputs):
+        payload = json.dumps([TEMPLATE_VERSION, inputs], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def page_is_current(self, name, inputs):
+        # 记录本次构建的输入哈希；仅当哈希未变且旧文件仍在时跳过渲染
+        digest = self.hash_inputs(inputs)
+        self.manifest['pages'][name] = digest
+        if not self.incremental: return False
+        if self.prev_manifest['pages'].get(name) != digest: return False
+        if not os.path.exists(os.path.join(self.build_dir, name)): return False
+        self.keep_content(name)
+        self.stats['skipped'] += 1
+        return True
+
+    def write_file(self, name, content):
+        # 先写临时文件再 os.replace：既保证单文件原子性，也会断开 staging 中的硬链接，不污染旧 output/
+        raw_size = None
+        if self.minify and name.endswith('.html'): content, raw_size = self.minify_page(content)
+        content_hash, size = self.atomic_write(os.path.join(self.build_dir, name), content)
+        if raw_size is not None: self.minify_report[name] = [raw_size, size]
+        self.record_content(name, content_hash)
+        self.stats['written'] += 1
+        self.stats['bytes'] += size
+
+    def atomic_write(self, path, content):
+        data = content.encode('utf-8') if isinstance(content, str) else content
+        parent = os.path.dirname(path)
+        if not os.path.exists(parent): os.makedirs(parent)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f: f.write(data)
+        os.replace(tmp_path, path)
+        return hashlib.sha256(data).hexdigest(), len(data)
+
+    def minify_page(self, html):
+        # 逐页压缩（写盘前，在渲染该页的进程内完成）；返回 (压缩后的 HTML, 压缩前字节数)
+        return minify_html(html), len(html.encode('utf-8'))
+
+    def record_content(self, name, content_hash):
+        # lastmod 只在产物内容真正变化时前进，未变化的页面沿用上一次的时间
+        previous = self.prev_manifest['content'].get(name)
+        if previous and previous['hash'] == content_hash:
+            self.manifest['content'][name] = previous
+        else:
+            self.manifest['content'][name] = {"hash": content_hash, "lastmod": self.build_time}
+
+    def keep_content(self, name):
+        previous = self.prev_manifest['content'].get(name)
+        if previous: self.manifest['content'][name] = previous
+
+    def get_lastmod(self, name):
+        return self.manifest['content'].get(name, {}).get('lastmod', self.build_time)
+
+    def load_manifest(self):
+        path = os.path.join(self.output_dir, MANIFEST_NAME)
+        if not os.path.exists(path): return
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                loaded = json.load(f)
+            loaded.setdefault('content', {})
+            if loaded.get('template_version') == TEMPLATE_VERSION:
+                self.prev_manifest = loaded
+            else:
+                # 模板变化时所有页面重新渲染，但 content 哈希仍可用来判断 lastmod 是否前进
+                self.prev_manifest['content'] = loaded['content']
+                if self.incremental: self.log("♻️ Template version changed. Full rebuild.")
+        except Exception as e:
+            self.log(f"⚠️ Manifest unreadable, full rebuild: {e}")
+
+    def prepare_build_dir(self):
+        if os.path.exists(self.build_dir): shutil.rmtree(self.build_dir)
+        # 中断的构建可能留下没被链接指向的发布目录
+        live = os.path.realpath(self.output_dir)
+        for release in glob.glob(glob.escape(self.output_dir) + '.build-*'):
+            if os.path.realpath(release) != live: shutil.rmtree(release, ignore_errors=True)
+        self.load_manifest()
+        # 没有可用清单（旧版本生成的 output/、模板版本变化）时所有页面都要重写，且无法知道哪些旧文件已经过期
+        # （例如旧的 sitemap.xml、未带指纹的 style.css），从空目录开始构建
+        if self.incremental and os.path.exists(self.output_dir) and self.prev_manifest['template_version'] == TEMPLATE_VERSION:
+            # 用硬链接复制上一次的产物：未变化的页面不会被重写（inode/mtime 保持不变）
+            try:
+                shutil.copytree(self.output_dir, self.build_dir, copy_function=os.link)
+            except OSError:
+                if os.path.exists(self.build_dir): shutil.rmtree(self.build_dir)
+                shutil.copytree(self.output_dir, self.build_dir)
+            for name in LEGACY_CACHE_NAMES:
+                if os.path.exists(os.path.join(self.build_dir, name)): os.remove(os.path.join(self.build_dir, name))
+        else:
+            os.makedirs(self.build_dir)
+
+    def remove_orphans(self):
+        # 上次构建生成、本次不再生成的页面（例如从 CSV 删除的 Provider）
+        for name in self.prev_manifest['pages']:
+            if name in self.manifest['pages']: continue
+            path = os.path.join(self.build_dir, name)
+            if os.path.exists(path):
+                os.remove(path)
+                self.stats['removed'] += 1
+                self.log(f"🗑️ Removed orphan: {name}")
+
+    def commit_build(self):
+        self.atomic_write(os.path.join(self.build_dir, MANIFEST_NAME), json.dumps(self.manifest, indent=2, sort_keys=True))
+        # output 是指向 output.build-<时间戳>/ 的符号链接，os.replace 原子地替换链接本身：
+        # 任何时刻 output/ 要么是完整旧站，要么是完整新站
+        release = f"{self.output_dir}.build-{datetime.datetime.now().strftime('%Y%m%dT%H%M%S%f')}"
+        os.rename(self.build_dir, release)
+        previous = os.path.realpath(self.output_dir) if os.path.islink(self.output_dir) else None
+        if os.path.isdir(self.output_dir) and not os.path.islink(self.output_dir):
+            # 旧版本留下的真实目录不能被链接原子替换：只在第一次切换时有一个 output/ 不存在的短暂窗口
+            previous = self.output_dir + '.old'
+            if os.path.exists(previous): shutil.rmtree(previous)
+            os.rename(self.output_dir, previous)
+        link = self.output_dir + '.link'
+        if os.path.lexists(link): os.remove(link)
+        try:
+            os.symlink(os.path.basename(release), link)
+            os.replace(link, self.output_dir)
+        except (OSError, NotImplementedError):
+            # 不支持符号链接（如未开启开发者模式的 Windows）：退回两次 rename，中间同样有一个短暂窗口
+            if os.path.islink(self.output_dir): os.remove(self.output_dir)
+            elif previous is None and os.path.exists(self.output_dir):
+                previous = self.output_dir + '.old'
+                if os.path.exists(previous): shutil.rmtree(previous)
+                os.rename(self.output_dir, previous)
+            os.rename(release, self.output_dir)
+        if previous and os.path.exists(previous): shutil.rmtree(previous, ignore_errors=True)
+
+    def discard_build(self):
+        if os.path.exists(self.build_dir): shutil.rmtree(self.build_dir, ignore_errors=True)
+
+    def get_affiliate_resolver(self):
+        if self._affiliate_resolver is None:
+            self._affiliate_resolver = AffiliateResolver(self.config.get('affiliate_map', {}))
+        return self._affiliate_resolver
+
+    def get_affiliate_link(self, provider, original_link):
+        return self.get_affiliate_resolver().resolve(provider) or original_link
+    
+    def get_real_domain(self, provider_name):
+        clean = str(provider_name).strip()
+        if clean in self.domain_map:
+            return self.domain_map[clean]
+        return f"{clean.lower().replace(' ', '')}.com"
+
+    # --- Logo 资源（构建时本地化，替代每次访问都外链 Google favicon）---
+    def prepare_logos(self, vpns):
+        self.log("🖼️ Preparing logos...")
+        # 按域名去重：PIA 与 Private Internet Access 共享同一个文件
+        for domain in dict.fromkeys(self.get_real_domain(v.name) for v in vpns):
+            self.prepare_logo(domain)
+        self.log_placeholder_logos()
+
+    def log_placeholder_logos(self):
+        # 缺失的 logo 用首字母占位图发布，但要明确提示：放入 data/logos/<domain>.png 或联网构建一次即可补齐
+        if self.placeholder_logos:
+            self.log(f"⚠️ {len(self.placeholder_logos)} logo(s) missing from data/logos/, using placeholders: {', '.join(self.placeholder_logos)}")
+
+    def prepare_logo(self, domain):
+        if domain in self.logo_urls: return self.logo_urls[domain]
+        if domain not in self.logo_data: self.logo_data[domain] = self.load_logo(domain)
+        data, ext = self.logo_data[domain]
+        safe_domain = re.sub(r'[^a-z0-9.-]', '-', domain.lower())
+        # 文件名带内容指纹，可长期缓存；logo 变化即换 URL
+        name = f"static/logos/{safe_domain}.{hashlib.sha256(data).hexdigest()[:10]}{ext}"
+        if not self.page_is_current(name, {"domain": domain}):
+            self.write_file(name, data)
+        self.logo_urls[domain] = '/' + name
+        return self.logo_urls[domain]
+
+    def load_logo(self, domain):
+        for ext in LOGO_EXTENSIONS:
+            path = os.path.join(self.logo_cache_dir, domain + ext)
+            if os.path.exists(path):
+                with open(path, 'rb') as f: return f.read(), ext
+        if self.logo_fetcher:
+            try:
+                fetched = self.logo_fetcher(domain)
+                if fetched:
+                    data, ext = fetched
+                    self.atomic_write(os.path.join(self.logo_cache_dir, domain + ext), data)
+                    self.log(f"⬇️ Cached logo for {domain}")
+                    return data, ext
+            except urllib.error.HTTPError as e:
+                self.log(f"⚠️ Logo fetch failed for {domain}: {e}")
+            except OSError as e:
+                # 网络不可用（离线构建）：本次构建不再逐个域名等待超时
+                self.log(f"⚠️ Logo fetch failed for {domain}, skipping remaining downloads: {e}")
+                self.logo_fetcher = None
+            except Exception as e:
+                self.log(f"⚠️ Logo fetch failed for {domain}: {e}")
+        self.placeholder_logos.append(domain)
+        initial = escape(domain[:1].upper() or '?')
+        return LOGO_PLACEHOLDER_SVG.format(initial=initial).encode('utf-8'), '.svg'
+
+    def get_logo_url(self, provider):
+        return self.prepare_logo(self.get_real_domain(provider))
+
+    # --- Schema Markup 生成器 (让 Google 显示星星) ---
+    def generate_schema_json(self, vpn):
+        # 骨架在 get_templates 中只序列化一次，这里只对变化的三个字段做 JSON 转义
+        return self.get_templates()['schema'].render(
+            name=json.dumps(vpn.name),
+            description=json.dumps(vpn.seo_meta_desc),
+            rating=json.dumps(str(vpn.rating_value)),
+        )
+
+    def build_schema(self, name, description, rating_value):
+        return {
+            "@context": "https://schema.org/",
+            "@type": "Product",
+            "name": name,
+            "description": description,
+            "review": {
+                "@type": "Review",
+                "reviewRating": {
+                    "@type": "Rating",
+                    "ratingValue": rating_value,
+                    "bestRating": "5"
+                },
+                "author": {
+                    "@type": "Organization",
+                    "name": self.config['site_name']
+                }
+            },
+            "aggregateRating": {
+                "@type": "AggregateRating",
+                "ratingValue": rating_value,
+                "reviewCount": "1280"
+            }
+        }
+
+    def get_common_script(self):
+        return f'<script src="{self.get_asset_url("app.js")}"></script>'
+
+    def get_asset_url(self, name):
+        return asset_url(name, self.minify)
+
+    def generate_assets(self):
+        for name in STATIC_ASSETS:
+            path = self.get_asset_url(name).lstrip('/')
+            if not self.page_is_current(path, {}): self.write_file(path, asset_content(name, self.minify))
+
+    def page_config_inputs(self):
+        # 所有页面共用的 config 字段（head/footer），增量构建哈希的一部分
+        return {
+            "site_name": self.config.get('site_name'),
+            "year": self.config.get('year'),
+            "google_analytics_id": self.config.get('google_analytics_id'),
+            "legal": self.config.get('legal'),
+            "locale": self.locale,
+            "assets": {name: self.get_asset_url(name) for name in STATIC_ASSETS},
+            "minify": MINIFY_VERSION if self.minify else None,
+        }
+
+    def get_templates(self):
+        # 只依赖 config 的片段（head 的 GA/favicon、footer、弹窗、公共脚本、站点文案）每次构建只渲染一次
+        if self._templates is not None: return self._templates
+        ga_id = self.config.get('google_analytics_id') or ''
+        ga_script = GA_TEMPLATE.render(ga_id=ga_id) if ga_id.startswith("G-") else ""
+        head_base = HEAD_TEMPLATE.bind(ga_script=ga_script, favicon=FAVICON_DATA_URI)
+        head = head_base.bind(stylesheet=f'<link rel="stylesheet" href="{self.get_asset_url("style.css")}">')
+        # 文案可能含 {{provider}}，以 Template 形式拼入，最后统一 bind 一次
+        strings = {f"t_{key}": Template(value).bind(year=self.config.get('year', '2026')) for key, value in self.locale.items()}
+        footer = FOOTER_TEMPLATE.bind(
+            year=self.config.get('year', '2026'),
+            site_name=self.config['site_name'],
+            disclosure=self.config.get('legal', {}).get('disclosure', 'Advertiser Disclosure: We are reader-supported.'),
+        )
+        top_bar = self.config['top_bar']
+        schema = json.dumps(self.build_schema('@@name@@', '@@description@@', '@@rating@@'))
+        for slot in ('name', 'description', 'rating'):
+            schema = schema.replace(f'"@@{slot}@@"', '{{%s}}' % slot)
+        # 首页与第 2..N 页排名页只有标题不同
+        ranking_page = INDEX_TEMPLATE.bind(
+            head=head_base.bind(stylesheet=self.get_index_stylesheet(), description=strings['t_index_description'], schema_html=""),
+            top_bar=f'<div class="top-bar" onclick="topBarClick()">{top_bar["text"]}</div>' if top_bar['enabled'] else "",
+            site_name=self.config['site_name'],
+            footer=footer.bind(privacy_label=Template("{{t_privacy_policy}}")),
+            exit_popup=EXIT_POPUP_TEMPLATE.bind(popup_cta=Template('<a href="#ranking" class="btn" onclick="closePopup()" style="width:100%; box-sizing:border-box; margin-top:15px; background:#ef4444;">{{t_claim_discount}}</a>')),
+            # 客户端渲染用的行模板：slot 换成 @@name@@ 占位符，由 ranking.js 替换
+            row_template=INDEX_ROW_TEMPLATE.bind(**strings).render(**{name: f"@@{name}@@" for _, name in INDEX_ROW_TEMPLATE.slots}),
+            common_script=self.get_common_script(),
+            search_base=f"{SEARCH_DIR}/",
+            ranking_script=f'<script src="{self.get_asset_url("ranking.js")}" defer></script><script src="{self.get_asset_url("search.js")}" defer></script>',
+        )
+        self._templates = {
+            "head": head,
+            "schema": Template(schema),
+            "index": ranking_page.bind(title=strings['t_index_title']).bind(**strings),
+            "ranking": ranking_page.bind(title=strings['t_ranking_title']).bind(**strings),
+            "ranking_tools": RANKING_TOOLS_TEMPLATE.bind(**strings),
+            "pagination": PAGINATION_TEMPLATE.bind(**strings),
+            "prev_link": Template('<a href="{{href}}" class="btn-outline" rel="prev">{{t_prev_page}}</a>').bind(**strings),
+            "next_link": Template('<a href="{{href}}" class="btn-outline" rel="next">{{t_next_page}}</a>').bind(**strings),
+            "index_row": INDEX_ROW_TEMPLATE.bind(**strings),
+            "champion": CHAMPION_TEMPLATE.bind(**strings),
+            "detail": DETAIL_TEMPLATE.bind(
+                head=head,
+                footer=footer.bind(privacy_label=Template("{{t_privacy}}")),
+                exit_popup=EXIT_POPUP_TEMPLATE.bind(popup_cta=Template('<a href="{{aff_link}}" class="btn" style="width:100%; box-sizing:border-box; margin-top:15px; background:#ef4444;">{{t_claim_discount}}</a>')),
+                common_script=self.get_common_script(),
+            ).bind(**strings),
+            "pros_cons": PROS_CONS_TEMPLATE.bind(**strings),
+            "compare_spec": COMPARE_SPEC_TEMPLATE.bind(**strings),
+            "compare": COMPARE_TEMPLATE.bind(
+                head=head.bind(title=strings['t_compare_title'], description=strings['t_compare_description'], schema_html=""),
+                footer=footer.bind(privacy_label=Template("{{t_privacy}}")),
+            ).bind(**strings),
+            "compare_rated_higher": strings['t_compare_rated_higher'],
+            "compare_same_rating": strings['t_compare_same_rating'],
+            "compare_cheaper": strings['t_compare_cheaper'],
+            "legal": LEGAL_TEMPLATE.bind(head=head).bind(**strings),
+            # 帖子历史是内部运营页面：noindex，且不进入 sitemap
+            "post_history": POST_HISTORY_TEMPLATE.bind(
+                head=head.bind(title=strings['t_post_history_title'], description=strings['t_post_history_description'], schema_html='<meta name="robots" content="noindex">'),
+                footer=footer.bind(privacy_label=Template("{{t_privacy}}")),
+            ).bind(**strings),
+            "near_duplicate": strings['t_near_duplicate'],
+        }
+        return self._templates
+
+    def get_index_stylesheet(self):
+        stylesheet = f'<link rel="stylesheet" href="{self.get_asset_url("style.css")}">'
+        if not self.inline_critical_css: return stylesheet
+        # 首屏规则内联，完整样式表异步加载（无 JS 时回退到普通 <link>）
+        return (f'<style>{critical_css(self.minify)}</style>'
+                f'<link rel="preload" href="{self.get_asset_url("style.css")}" as="style" onload="this.onload=null;this.rel=\'stylesheet\'">'
+                f'<noscript>{stylesheet}</noscript>')
+
+    def generate_index(self, vpns):
+        # 排名按 CSV 顺序分页：index.html 为第 1 页，其余为 ranking-<n>.html；
+        # 三种排序与 best_for / Streaming_Support 过滤各自切成 JSON 分片，供 ranking.js 按需请求
+        self.log("🏆 Generating Ranking Pages...")
+        page_size = max(1, int(self.config.get('ranking_page_size', RANKING_PAGE_SIZE)))
+        rows = [self.ranking_row(rank, vpn) for rank, vpn in enumerate(vpns, 1)]
+        shards, filter_options = self.ranking_facets(vpns)
+        page_counts = {}
+        for shard, order in shards.items():
+            page_counts[shard] = max(1, -(-len(order) // page_size))
+            for page in range(page_counts[shard]):
+                payload = json.dumps([rows[i] for i in order[page * page_size:(page + 1) * page_size]], ensure_ascii=False, separators=(',', ':'))
+                name = f"{RANKING_DIR}/{shard}-{page + 1}.json"
+                if not self.page_is_current(name, payload): self.write_file(name, payload)
+
+        templates = self.get_templates()
+        facets_json = json.dumps({"fields": RANKING_FIELDS, "shards": page_counts}, ensure_ascii=False, separators=(',', ':'))
+        tools_html = templates['ranking_tools'].render(
+            base=f"{RANKING_DIR}/",
+            facets_json=escape(facets_json, {'"': '&quot;'}),
+            sort_options="".join(f'<option value="{key}">{self.locale[f"sort_{key}"]}</option>' for key in ('rank', 'rating', 'price')),
+            filter_options=filter_options,
+        )
+        pages = page_counts['sort-rank']
+        self.ranking_pages = [self.ranking_page_name(page) for page in range(2, pages + 1)]
+        for page in range(1, pages + 1):
+            page_rows = rows[(page - 1) * page_size:page * page_size]
+            name = self.ranking_page_name(page)
+            inputs = {
+                "config": self.page_config_inputs(),
+                "top_bar": self.config.get('top_bar'),
+                "stylesheet": self.get_index_stylesheet(),
+                "tools": tools_html,
+                "page": [page, pages],
+                "rows": page_rows,
+            }
+            if self.page_is_current(name, inputs): continue
+            row_template = templates['index_row']
+            values = dict(
+                champion_html=self.render_champion(vpns[0]) if page == 1 and vpns else "",
+                ranking_tools=tools_html,
+                rows_html="".join([row_template.render(**self.ranking_row_values(row)) for row in page_rows]),
+                pagination=self.render_pagination(page, pages),
+            )
+            html = templates['index'].render(**values) if page == 1 else templates['ranking'].render(page=str(page), **values)
+            self.write_file(name, html)
+
+    def ranking_page_name(self, page):
+        return 'index.html' if page == 1 else f'ranking-{page}.html'
+
+    def ranking_row(self, rank, vpn):
+        # 字段顺序见 RANKING_FIELDS；同一行在 HTML 分页与所有 JSON 分片中复用
+        return [rank, self.get_review_slug(vpn.name), self.get_logo_url(vpn.name), vpn.name, vpn.star_rating, vpn.best_for,
+                vpn.streaming_support, vpn.price_monthly, self.get_affiliate_link(vpn.name, vpn.affiliate_link), vpn.rating_value, vpn.price_value]
+
+    def ranking_row_values(self, row):
+        values = dict(zip(RANKING_FIELDS, row))
+        values['rank_class'] = "rank-1" if values['rank'] == 1 else ""
+        values['rank'] = str(values['rank'])
+        return values
+
+    def ranking_facets(self, vpns):
+        # 排序只做一次（sorted 稳定，同分按原排名）；过滤分片保持排名顺序
+        order = list(range(len(vpns)))
+        shards = collections.OrderedDict([
+            ("sort-rank", order),
+            ("sort-rating", sorted(order, key=lambda i: -vpns[i].rating_value)),
+            ("sort-price", sorted(order, key=lambda i: (vpns[i].price_value is None, vpns[i].price_value or 0))),
+        ])
+        options = []
+        for facet, values_of in (('best_for', lambda vpn: (vpn.best_for,) if vpn.best_for else ()),
+                                 ('streaming', lambda vpn: vpn.streaming_services)):
+            groups = collections.OrderedDict()
+            for i, vpn in enumerate(vpns):
+                for value in values_of(vpn): groups.setdefault(value, []).append(i)
+            group_options = []
+            # 常见的值排在前面
+            for value, members in sorted(groups.items(), key=lambda item: -len(item[1])):
+                shard = slug = f"{facet.replace('_', '-')}-{re.sub(r'[^a-z0-9]+', '-', value.lower()).strip('-') or 'other'}"
+                suffix = 2
+                while shard in shards:
+                    shard, suffix = f"{slug}-{suffix}", suffix + 1
+                shards[shard] = members
+                group_options.append(f'<option value="{shard}">{value} ({len(members)})</option>')
+            if group_options:
+                options.append(f'<optgroup label="{self.locale[f"filter_{facet}"]}">{"".join(group_options)}</optgroup>')
+        return shards, "".join(options)
+
+    def render_champion(self, champion):
+        return self.get_templates()['champion'].render(
+            logo_url=self.get_logo_url(champion.name),
+            provider=champion.name,
+            best_for=champion.best_for,
+            rating=champion.star_rating,
+            price=champion.price_monthly,
+            aff_link=self.get_affiliate_link(champion.name, champion.affiliate_link),
+            slug=self.get_review_slug(champion.name),
+        )
+
+    def render_pagination(self, page, pages):
+        if pages <= 1: return ""
+        templates = self.get_templates()
+        return templates['pagination'].render(
+            page=str(page),
+            pages=str(pages),
+            prev_link=templates['prev_link'].render(href=self.ranking_page_name(page - 1)) if page > 1 else "<span></span>",
+            next_link=templates['next_link'].render(href=self.ranking_page_name(page + 1)) if page < pages else "<span></span>",
+        )
+
+    def get_review_slug(self, provider):
+        return f"{str(provider).lower().replace(' ', '-')}-review.html"
+
+    def detail_inputs(self, vpn):
+        return {
+            "config": self.page_config_inputs(),
+            "row": vpn.to_tuple(),
+            "aff_link": self.get_affiliate_link(vpn.name, vpn.affiliate_link),
+            "logo": self.get_logo_url(vpn.name),
+        }
+
+    def generate_details(self, vpns):
+        self.log("📝 Generating Detail Pages...")
+        if self.jobs > 1:
+            results = self.write_details_parallel(self.iter_pending_details(vpns))
+        else:
+            results = (self.write_detail(*task) for task in self.iter_pending_details(vpns))
+
+        for slug, content_hash, size, error, raw_size, normalized in results:
+            # 子进程规范化的正文回到主进程写入缓存
+            if normalized: self.review_cache[normalized[0]] = normalized[1]
+            if error: self.page_failed(slug, error)
+            else:
+                self.record_content(slug, content_hash)
+                self.stats['written'] += 1
+                self.stats['bytes'] += size
+                if raw_size is not None: self.minify_report[slug] = [raw_size, size]
+        if self.minify: self.save_review_cache()
+
+    def iter_pending_details(self, vpns):
+        # generated_urls 在主进程按 CSV 顺序登记，保证 sitemap 与并行度无关
+        if self.minify: self.load_review_cache()
+        for vpn in vpns:
+            slug = self.get_review_slug(vpn.name)
+            self.generated_urls.append(slug)
+            review_key = self.review_key(vpn.long_review) if self.minify else None
+            if self.page_is_current(slug, self.detail_inputs(vpn)): continue
+            # 命中缓存时在主进程直接替换正文；未命中的连同 key 交给渲染该页的进程解析（--jobs 时在子进程内并行）
+            if review_key in self.review_cache: yield slug, self.replace_review(vpn, self.review_cache[review_key]), None
+            else: yield slug, vpn, review_key
+
+    def write_details_parallel(self, pending):
+        # 有界提交：队列满时先等最早的任务完成，内存占用与 CSV 行数无关
+        self.log(f"⚙️ Rendering detail pages with {self.jobs} workers...")
+        in_flight = collections.deque()
+        # spawn 而不是 fork：--sites 时各站点线程同时持有锁，fork 出的子进程可能继承被占用的锁而死锁
+        with ProcessPoolExecutor(max_workers=self.jobs, mp_context=multiprocessing.get_context('spawn'), initializer=_init_worker, initargs=(self,)) as pool:
+            for task in pending:
+                in_flight.append(pool.submit(_write_detail_worker, task))
+                if len(in_flight) >= self.jobs * JOBS_QUEUE_DEPTH:
+                    yield in_flight.popleft().result()
+            while in_flight:
+                yield in_flight.popleft().result()
+
+    def write_detail(self, slug, vpn, review_key=None):
+        # 单页失败只返回错误信息，不中断整个构建（也用于子进程）；review_key 不为空时先规范化正文，
+        # 结果 (key, 规范化后的正文或 None) 随返回值交给主进程缓存
+        try:
+            normalized = None
+            if review_key is not None:
+                review = normalize_review(vpn.long_review)
+                normalized = (review_key, None if review == vpn.long_review else review)
+                vpn = self.replace_review(vpn, normalized[1])
+            html, raw_size = self.render_detail(vpn), None
+            if self.minify: html, raw_size = self.minify_page(html)
+            content_hash, size = self.atomic_write(os.path.join(self.build_dir, slug), html)
+            return slug, content_hash, size, None, raw_size, normalized
+        except Exception as e:
+            return slug, None, 0, f"{type(e).__name__}: {e}", None, None
+
+    def review_key(self, review):
+        # 登记本次构建用到的正文（保存缓存时只保留这些），返回缓存 key
+        key = hashlib.sha256(review.encode('utf-8')).hexdigest()
+        self.review_keys.add(key)
+        return key
+
+    def replace_review(self, vpn, review):
+        # review 为 None 表示规范化后与原文相同
+        if review is None: return vpn
+        # 多站点构建共享 Provider 对象，复制一份再替换正文
+        row = Provider(*vpn.to_tuple())
+        row.long_review = review
+        return row
+
+    def load_review_cache(self):
+        self.review_cache, self.review_keys = {}, set()
+        if not os.path.exists(self.review_cache_path): return
+        try:
+            with open(self.review_cache_path, 'rb') as f: loaded = pickle.load(f)
+            if loaded.get('version') == MINIFY_VERSION: self.review_cache = loaded['reviews']
+        except Exception as e:
+            self.log(f"⚠️ Review cache unreadable, re-normalizing: {e}")
+
+    def save_review_cache(self):
+        # 完整构建只保留本次用到的条目；局部重建（build_dir 即 output/）只看到部分行，保留全部
+        reviews = self.review_cache
+        if self.build_dir != self.output_dir:
+            reviews = {key: value for key, value in reviews.items() if key in self.review_keys}
+        self.atomic_write(self.review_cache_path,
+                          pickle.dumps({"version": MINIFY_VERSION, "reviews": reviews}, pickle.HIGHEST_PROTOCOL))
+
+    def page_failed(self, slug, error):
+        self.failed_pages.append((slug, error))
+        self.log(f"❌ Page failed: {slug} ({error})")
+        # 保留上一次的哈希（下次构建会重试）；若旧页面也不存在，则不写入 sitemap
+        previous = self.prev_manifest['pages'].get(slug)
+        if previous and os.path.exists(os.path.join(self.build_dir, slug)):
+            self.manifest['pages'][slug] = previous
+            self.keep_content(slug)
+        else:
+            self.manifest['pages'].pop(slug, None)
+            self.generated_urls.remove(slug)
+
+    def render_detail(self, vpn):
+        provider = vpn.name
+        aff_link = self.get_affiliate_link(provider, vpn.affiliate_link)
+        logo_url = self.get_logo_url(provider)
+        long_review = vpn.long_review
+        if not long_review or len(long_review) < 50:
+            long_review = f"<h3>Why {provider}?</h3><p>Detailed review coming soon...</p>"
+
+        # 优缺点在 Provider.from_row 中已拆分并去空
+        pros_html = "".join([f'<div class="pro-item">{p}</div>' for p in vpn.pros])
+        cons_html = "".join([f'<div class="con-item">{p}</div>' for p in vpn.cons])
+        
+        pros_cons_box = self.get_templates()['pros_cons'].render(pros_html=pros_html, cons_html=cons_html) if pros_html or cons_html else ""
+
+        # 生成 Schema
+        schema_json = self.generate_schema_json(vpn)
+
+        return self.get_templates()['detail'].render(
+            title=vpn.seo_title,
+            description=vpn.seo_meta_desc,
+            schema_html=f'<script type="application/ld+json">{schema_json}</script>',
+            provider=provider,
+            logo_url=logo_url,
+            rating=vpn.star_rating,
+            aff_link=aff_link,
+            pros_cons_box=pros_cons_box,
+            long_review=long_review,
+        )
+
+    def get_compare_policy(self):
+        policy = self.config.get('comparisons', {})
+        if policy is False: return None
+        return dict(COMPARE_POLICY, **(policy if isinstance(policy, dict) else {}))
+
+    def iter_compare_pairs(self, vpns, policy):
+        # 按优先级产出 (i, j)（i < j，即 i 排名更高）：先排名前 top_k，再同一 best_for 内的前 top_k；
+        # 每组最多 C(top_k, 2) 对，总数受 max_pages 限制，页面数不随目录规模平方增长
+        top_k, max_pages = max(0, int(policy['top_k'])), max(0, int(policy['max_pages']))
+        groups = [list(range(min(top_k, len(vpns))))]
+        if policy['same_best_for']:
+            by_best_for = collections.OrderedDict()
+            for i, vpn in enumerate(vpns):
+                if vpn.best_for: by_best_for.setdefault(vpn.best_for, []).append(i)
+            groups.extend(members[:top_k] for members in by_best_for.values())
+        seen = set()
+        for members in groups:
+            for a, i in enumerate(members):
+                for j in members[a + 1:]:
+                    if (i, j) in seen: continue
+                    if len(seen) >= max_pages: return
+                    seen.add((i, j))
+                    yield i, j
+
+    def compare_page_name(self, a, b):
+        # 文件名按 slug 字母序，排名变化时 URL 不变；slug 与评测页一致（<slug>-review.html）
+        first, second = sorted(self.get_review_slug(name)[:-len('-review.html')] for name in (a, b))
+        return f"{first}-vs-{second}.html"
+
+    def compare_spec(self, vpn):
+        # 返回 (规格卡片 HTML, 输入)：对比页的增量哈希只由两侧的输入组成，Long_Review 等字段的修改不会触发重建
+        inputs = {
+            "slug": self.get_review_slug(vpn.name),
+            "logo_url": self.get_logo_url(vpn.name),
+            "provider": vpn.name,
+            "rating": vpn.star_rating,
+            "price": vpn.price_monthly,
+            "servers": vpn.server_count,
+            "no_logs": vpn.no_logs,
+            "streaming": vpn.streaming_support,
+            "money_back": vpn.money_back,
+            "aff_link": self.get_affiliate_link(vpn.name, vpn.affiliate_link),
+        }
+        return self.get_templates()['compare_spec'].render(**inputs), inputs
+
+    def generate_comparisons(self, vpns):
+        self.compare_pages = []
+        policy = self.get_compare_policy()
+        if not policy: return
+        self.log("⚖️ Generating Comparison Pages...")
+        # 规格卡片按需渲染并缓存：一个 Provider 出现在多少对中都只渲染一次；页面逐个写盘，不在内存中累积
+        specs, config_inputs, rendered = {}, self.page_config_inputs(), 0
+        for i, j in self.iter_compare_pairs(vpns, policy):
+            for k in (i, j):
+                if k not in specs: specs[k] = self.compare_spec(vpns[k])
+            a, b = vpns[i], vpns[j]
+            name = self.compare_page_name(a.name, b.name)
+            self.compare_pages.append(name)
+            if self.page_is_current(name, {"config": config_inputs, "a": specs[i][1], "b": specs[j][1]}): continue
+            self.write_file(name, self.render_comparison(a, b, specs[i][0], specs[j][0]))
+            rendered += 1
+        # 局部重建（run_partial）据此删除不再入选的对比页
+        self.manifest['comparisons'] = self.compare_pages
+        self.log(f"⚖️ {len(self.compare_pages)} comparison page(s) from {len(specs)} spec card(s); {rendered} rendered")
+
+    def render_comparison(self, a, b, spec_a, spec_b):
+        templates = self.get_templates()
+        if a.rating_value == b.rating_value:
+            verdict = [templates['compare_same_rating'].render(rating=a.star_rating)]
+        else:
+            winner = a if a.rating_value > b.rating_value else b
+            verdict = [templates['compare_rated_higher'].render(provider=winner.name, rating=winner.star_rating)]
+        if a.price_value is not None and b.price_value is not None and a.price_value != b.price_value:
+            cheaper = a if a.price_value < b.price_value else b
+            verdict.append(templates['compare_cheaper'].render(provider=cheaper.name, price=cheaper.price_monthly))
+        return templates['compare'].render(
+            provider_a=a.name,
+            provider_b=b.name,
+            verdict=f'<p class="compare-verdict">{" ".join(verdict)}</p>',
+            spec_a=spec_a,
+            spec_b=spec_b,
+        )
+
+    def generate_search_index(self):
+        # 只对检索字段变化的行重新分词（缓存与产物一起保存）；倒排表每次重新合并，内容未变的分片不重写
+        self.log("🔎 Generating Search Index...")
+        previous = self.load_search_cache()
+        cache, doc_terms, docs, tokenized = {}, [], [], 0
+        for vpn in self.iter_rows():
+            digest = self.hash_inputs(searchable_fields(vpn))
+            entry = previous.get(vpn.name)
+            if not entry or entry[0] != digest:
+                entry = (digest, provider_terms(vpn))
+                tokenized += 1
+            cache[vpn.name] = entry
+            doc_terms.append(entry[1])
+            docs.append([self.get_review_slug(vpn.name), vpn.name, vpn.star_rating, vpn.best_for])
+
+        shard_bytes = int(self.config.get('search_shard_bytes', SEARCH_SHARD_BYTES))
+        shards = shard_index(build_postings(doc_terms), shard_bytes)
+        prefixes = {}
+        for number, (shard_prefixes, terms) in enumerate(shards):
+            prefixes.update((prefix, number) for prefix in shard_prefixes)
+            self.write_search_file(f"shard-{number}.json", terms)
+        for start in range(0, len(docs), SEARCH_DOCS_PER_CHUNK):
+            self.write_search_file(f"docs-{start // SEARCH_DOCS_PER_CHUNK}.json", docs[start:start + SEARCH_DOCS_PER_CHUNK])
+        self.write_search_file("meta.json", {"docs": len(docs), "chunk": SEARCH_DOCS_PER_CHUNK, "shards": prefixes, "stop": sorted(STOPWORDS)})
+        self.atomic_write(self.search_cache_path,
+                          pickle.dumps({"version": SEARCH_INDEX_VERSION, "docs": cache}, pickle.HIGHEST_PROTOCOL))
+        self.log(f"🔎 {len(docs)} docs, {sum(len(terms) for _, terms in shards)} terms in {len(shards)} shard(s); {tokenized} row(s) re-tokenized")
+
+    def write_search_file(self, name, obj):
+        name, payload = f"{SEARCH_DIR}/{name}", encode(obj)
+        if not self.page_is_current(name, payload): self.write_file(name, payload)
+
+    def load_search_cache(self):
+        # 与页面一致：只有增量构建才复用上一次的分词结果
+        if not self.incremental or not os.path.exists(self.search_cache_path): return {}
+        try:
+            with open(self.search_cache_path, 'rb') as f: loaded = pickle.load(f)
+            return loaded['docs'] if loaded.get('version') == SEARCH_INDEX_VERSION else {}
+        except Exception as e:
+            self.log(f"⚠️ Search cache unreadable, re-tokenizing: {e}")
+            return {}
+
+    def generate_post_history(self, vpns):
+        # 先增量 ingest marketing/ 日志，再为每个有帖子的 Provider 输出 <slug>-posts.html
+        self.log("📣 Generating Post History Pages...")
+        index = MarketingIndex(base_dir=self.base_dir)
+        try:
+            index.ingest()
+            for vpn in vpns:
+                slug = provider_slug(vpn.name)
+                posts = [(row['posted_at'], row['body'], row['duplicate_of'] is not None) for row in index.history(slug=slug)]
+                if not posts: continue
+                name = f"{slug}-posts.html"
+                if self.page_is_current(name, {"config": self.page_config_inputs(), "provider": vpn.name, "posts": posts}): continue
+                self.write_file(name, self.render_post_history(vpn.name, posts))
+        finally:
+            index.close()
+
+    def render_post_history(self, provider, posts):
+        # 最新的在前；近似重复的帖子保留但加标记
+        templates = self.get_templates()
+        posts_html = "".join([POST_ITEM_TEMPLATE.render(
+            posted_at=escape(posted_at),
+            duplicate_badge=f'<span class="badge">{templates["near_duplicate"].render()}</span>' if duplicate else "",
+            body=escape(body).replace('\n', '<br>'),
+        ) for posted_at, body, duplicate in reversed(posts)])
+        return templates['post_history'].render(
+            provider=provider,
+            review_slug=self.get_review_slug(provider),
+            post_count=str(len(posts)),
+            unique_count=str(sum(1 for _, _, duplicate in posts if not duplicate)),
+            posts_html=posts_html,
+        )
+
+    def generate_legal(self):
+        for page in ['privacy', 'terms']:
+            if self.page_is_current(f'{page}.html', {"config": self.page_config_inputs()}): continue
+            title = self.locale[f'{page}_title']
+            content = self.locale[f'{page}_content']
+            html = self.get_templates()['legal'].render(title=title, description=title, schema_html="", content=content)
+            self.write_file(f'{page}.html', html)
+
+    def generate_sitemap(self):
+        # sitemap 协议上限：单文件 50,000 个 URL / 50MB（未压缩）；超出则分片，由 sitemap_index.xml 汇总
+        base_url = self.config.get('domain', 'https://vpn.ii-x.com')
+        entries = [(f"{base_url}/", self.get_lastmod('index.html'), '1.0')]
+        entries.extend((f"{base_url}/{url}", self.get_lastmod(url), '0.6') for url in self.ranking_pages)
+        entries.extend((f"{base_url}/{url}", self.get_lastmod(url), '0.8') for url in self.generated_urls)
+        entries.extend((f"{base_url}/{url}", self.get_lastmod(url), '0.5') for url in self.compare_pages)
+
+        shards = []
+        for number, shard in enumerate(self.split_sitemap(entries), 1):
+            name = f"sitemap-{number}.xml.gz"
+            shards.append((name, max(lastmod for _, lastmod in shard)))
+            if not self.page_is_current(name, shard):
+                self.write_sitemap_shard(name, shard)
+
+        if not self.page_is_current('sitemap_index.xml', {"domain": base_url, "shards": shards}):
+            xml = ['<?xml version="1.0" encoding="UTF-8"?>\n<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n']
+            for name, lastmod in shards:
+                xml.append(f'<sitemap><loc>{escape(base_url)}/{name}</loc><lastmod>{lastmod}</lastmod></sitemap>\n')
+            xml.append('</sitemapindex>')
+            self.write_file('sitemap_index.xml', "".join(xml))
+        if not self.page_is_current('robots.txt', {"domain": base_url}):
+            self.write_file('robots.txt', f"User-agent: *\nAllow: /\nSitemap: {base_url}/sitemap_index.xml")
+
+    def split_sitemap(self, entries):
+        # 逐条生成 <url> 行并按数量/字节上限切分；每个分片是 [(xml 行, lastmod), ...]
+        shard, shard_bytes = [], len(SITEMAP_HEADER) + len(SITEMAP_FOOTER)
+        for loc, lastmod, priority in entries:
+            line = f'<url><loc>{escape(loc)}</loc><lastmod>{lastmod}</lastmod><priority>{priority}</priority></url>\n'
+            line_bytes = len(line.encode('utf-8'))
+            if shard and (len(shard) >= SITEMAP_MAX_URLS or shard_bytes + line_bytes > SITEMAP_MAX_BYTES):
+                yield shard
+                shard, shard_bytes = [], len(SITEMAP_HEADER) + len(SITEMAP_FOOTER)
+            shard.append((line, lastmod))
+            shard_bytes += line_bytes
+        if shard: yield shard
+
+    def write_sitemap_shard(self, name, shard):
+        # 边写边压缩；mtime=0 让相同内容得到相同字节，方便增量比较与 ETag
+        path = os.path.join(self.build_dir, name)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as raw, gzip.GzipFile(filename='', mode='wb', fileobj=raw, mtime=0) as f:
+            f.write(SITEMAP_HEADER.encode('utf-8'))
+            for line, _ in shard: f.write(line.encode('utf-8'))
+            f.write(SITEMAP_FOOTER.encode('utf-8'))
+        os.replace(tmp_path, path)
+        self.stats['written'] += 1
+        self.stats['bytes'] += os.path.getsize(path)
+
+    # --- 预压缩与 ETag 清单（构建后阶段，在 staging 中完成，随整站一起原子替换）---
+    def list_text_assets(self):
+        assets = []
+        for root, dirs, files in os.walk(self.build_dir):
+            dirs[:] = [d for d in dirs if not d.startswith('.')]
+            for name in files:
+                if name.startswith('.') or name == ETAG_MANIFEST_NAME: continue
+                if name.endswith(PRECOMPRESS_EXTENSIONS):
+                    assets.append(os.path.relpath(os.path.join(root, name), self.build_dir).replace(os.sep, '/'))
+        return sorted(assets)
+
+    def load_etag_manifest(self):
+        for base in (self.build_dir, self.output_dir):
+            path = os.path.join(base, ETAG_MANIFEST_NAME)
+            if os.path.exists(path):
+                try:
+                    with open(path, 'r', encoding='utf-8') as f: return json.load(f)
+                except Exception as e:
+                    self.log(f"⚠️ {ETAG_MANIFEST_NAME} unreadable, recompressing everything: {e}")
+                    return {}
+        return {}
+
+    def precompress_file(self, rel, previous):
+        path = os.path.join(self.build_dir, rel)
+        with open(path, 'rb') as f: data = f.read()
+        digest = hashlib.sha256(data).hexdigest()
+        entry = {"etag": f'"{digest[:32]}"', "size": len(data), "encodings": {}}
+        written = 0
+        for encoding, suffix, compress in get_encoders():
+            target = path + suffix
+            old = (previous or {}).get('encodings', {}).get(encoding)
+            reuse = old is not None and previous['etag'] == entry['etag']
+            if reuse and not os.path.exists(target):
+                # 全量构建时 staging 是空的：从线上 output/ 复用未变化文件的压缩结果
+                source = os.path.join(self.output_dir, rel + suffix)
+                if os.path.exists(source): shutil.copy2(source, target)
+                else: reuse = False
+            if reuse:
+                entry['encodings'][encoding] = old
+                continue
+            packed = compress(data)
+            with open(target + '.tmp', 'wb') as f: f.write(packed)
+            os.replace(target + '.tmp', target)
+            entry['encodings'][encoding] = {"file": rel + suffix, "size": len(packed)}
+            written += len(packed)
+        return rel, entry, written
+
+    def remove_stale_variants(self, previous, current):
+        # 源文件已删除、或某种编码不再生成时，清理对应的压缩兄弟文件
+        for rel, entry in previous.items():
+            for encoding, variant in entry.get('encodings', {}).items():
+                if encoding in current.get(rel, {}).get('encodings', {}): continue
+                path = os.path.join(self.build_dir, variant['file'])
+                if os.path.exists(path): os.remove(path)
+
+    def precompress_output(self):
+        previous = self.load_etag_manifest()
+        if not self.precompress:
+            # 关闭预压缩时，不能留下与新页面不一致的旧 .gz
+            self.remove_stale_variants(previous, {})
+            stale = os.path.join(self.build_dir, ETAG_MANIFEST_NAME)
+            if os.path.exists(stale): os.remove(stale)
+            return
+        self.log("🗜️ Precompressing text assets...")
+        # zlib/brotli/zstd 压缩时会释放 GIL，线程池即可并行
+        with ThreadPoolExecutor() as pool:
+            results = list(pool.map(lambda rel: self.precompress_file(rel, previous.get(rel)), self.list_text_assets()))
+        etags = {rel: entry for rel, entry, _ in results}
+        self.stats['compressed'] += sum(1 for _, _, written in results if written)
+        self.stats['bytes'] += sum(written for _, _, written in results)
+        self.remove_stale_variants(previous, etags)
+        self.atomic_write(os.path.join(self.build_dir, ETAG_MANIFEST_NAME), json.dumps(etags, indent=2, sort_keys=True))
+
+    # --- --watch：依赖感知的局部重建 ---
+    def catalog_snapshot(self):
+        # Provider 名 -> 行摘要（CSV 顺序），用于判断哪些详情页受编辑影响
+        return collections.OrderedDict((vpn.name, self.hash_inputs(vpn.to_tuple())) for vpn in self.iter_rows())
+
+    def plan_rebuild(self, old_config, old_rows, rows):
+        # 返回 (需要检查的 Provider 名, 已删除的 Provider 名)；None 表示改动面太大，走完整增量构建。
+        # 首页与 sitemap 每次都会按输入哈希检查，代价很小，因此 top_bar / domain 不需要单独处理
+        changed_keys = {key for key in set(old_config) | set(self.config) if old_config.get(key) != self.config.get(key)}
+        if changed_keys - {'affiliate_map', 'top_bar', 'domain'}: return None
+        names = {name for name, digest in rows.items() if old_rows.get(name) != digest}
+        if 'affiliate_map' in changed_keys:
+            old_resolver = AffiliateResolver(old_config.get('affiliate_map', {}))
+            names.update(name for name in rows if old_resolver.resolve(name) != self.get_affiliate_resolver().resolve(name))
+        return names, [name for name in old_rows if name not in rows]
+
+    def run_partial(self, names, removed=()):
+        # 直接原子写入 output/（每个文件单独 os.replace，预览不会读到半个文件），清单中其余条目原样保留
+        build_start = time.perf_counter()
+        status = "failed"
+        self.incremental = True
+        self.load_manifest()
+        if self.prev_manifest['template_version'] != TEMPLATE_VERSION: return self.run()
+        self.build_dir = self.output_dir
+        self.manifest['pages'] = dict(self.prev_manifest['pages'])
+        self.manifest['content'] = dict(self.prev_manifest['content'])
+        try:
+            for name in removed:
+                slug = self.get_review_slug(name)
+                self.manifest['pages'].pop(slug, None)
+                self.manifest['content'].pop(slug, None)
+                if os.path.exists(os.path.join(self.output_dir, slug)):
+                    os.remove(os.path.join(self.output_dir, slug))
+                    self.stats['removed'] += 1
+            vpns = self.load_index_rows()
+            self.generate_index(vpns)
+            self.generate_details(vpn for vpn in self.iter_rows() if vpn.name in names)
+            self.generate_search_index()
+            self.generate_comparisons(vpns)
+            for name in set(self.prev_manifest.get('comparisons', ())) - set(self.compare_pages):
+                self.manifest['pages'].pop(name, None)
+                self.manifest['content'].pop(name, None)
+                if os.path.exists(os.path.join(self.output_dir, name)):
+                    os.remove(os.path.join(self.output_dir, name))
+                    self.stats['removed'] += 1
+            # sitemap 需要全部详情页（CSV 顺序）；page_failed 已把没有旧版本的失败页面移出清单
+            self.generated_urls = [slug for slug in (self.get_review_slug(vpn.name) for vpn in vpns) if slug in self.manifest['pages']]
+            self.generate_sitemap()
+            self.precompress_output()
+            self.atomic_write(os.path.join(self.output_dir, MANIFEST_NAME), json.dumps(self.manifest, indent=2, sort_keys=True))
+            status = "ok"
+            self.log(f"⚡ Partial rebuild: {len(names)} provider(s) checked, {self.stats['written']} written, {self.stats['removed']} removed in {(time.perf_counter() - build_start) * 1000:.0f} ms")
+        except Exception as e:
+            # 此时 build_dir 就是 output/，不能 discard_build；下一次完整构建会修复
+            self.log(f"❌ PARTIAL REBUILD FAILED: {e}")
+        finally:
+            self.finish_profile(status, time.perf_counter() - build_start)
+
+    def log_minify_savings(self):
+        # 汇总 + 节省最多的几页；逐页明细写入 --profile 报告的 "minify" 字段
+        if not self.minify_report: return
+        before = sum(raw for raw, _ in self.minify_report.values())
+        after = sum(size for _, size in self.minify_report.values())
+        self.log(f"🗜️ Minified {len(self.minify_report)} page(s): {before:,} -> {after:,} bytes (-{(before - after) * 100 / before:.1f}%)")
+        for name, (raw, size) in sorted(self.minify_report.items(), key=lambda item: item[1][1] - item[1][0])[:5]:
+            self.log(f"   {name}: {raw:,} -> {size:,} bytes (-{(raw - size) * 100 / raw:.1f}%)")
+
+    # --- 构建埋点 ---
+    def add_hook(self, hook):
+        self.hooks.append(hook)
+
+    def emit(self, event, data):
+        for hook in self.hooks: hook(event, data)
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        self.emit('stage_start', {"stage": name})
+        before = dict(self.stats)
+        rss_before, rss_children_before = peak_rss_kb()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            pages = self.stats['written'] - before['written']
+            rss, rss_children = peak_rss_kb()
+            record = {
+                "stage": name,
+                "seconds": round(seconds, 4),
+                "pages": pages,
+                "skipped": self.stats['skipped'] - before['skipped'],
+                "bytes": self.stats['bytes'] - before['bytes'],
+                "pages_per_sec": round(pages / seconds, 1) if pages and seconds else 0,
+                # ru_maxrss 是进程启动以来的峰值，只增不减：*_growth_kb 是本阶段把峰值抬高了多少（0 表示没有超过之前的阶段），
+                # process_peak_* 是到本阶段结束为止的累计峰值
+                "peak_rss_growth_kb": rss - rss_before if rss is not None else None,
+                "peak_rss_children_growth_kb": rss_children - rss_children_before if rss_children is not None else None,
+                "process_peak_rss_kb": rss,
+                "process_peak_rss_children_kb": rss_children,
+            }
+            self.profile['stages'].append(record)
+            self.emit('stage_end', record)
+
+    def finish_profile(self, status, seconds):
+        rss, rss_children = peak_rss_kb()
+        self.profile = {
+            "version": TEMPLATE_VERSION,
+            "status": status,
+            "build_time": self.build_time,
+            "incremental": self.incremental,
+            "jobs": self.jobs,
+            "seconds": round(seconds, 4),
+            "pages": self.stats['written'],
+            "bytes": self.stats['bytes'],
+            "pages_per_sec": round(self.stats['written'] / seconds, 1) if seconds else 0,
+            "peak_rss_kb": rss,
+            "peak_rss_children_kb": rss_children,
+            "stats": dict(self.stats),
+            "failed_pages": [slug for slug, _ in self.failed_pages],
+            "stages": self.profile['stages'],
+        }
+        if self.minify:
+            before = sum(raw for raw, _ in self.minify_report.values())
+            after = sum(size for _, size in self.minify_report.values())
+            self.profile['minify'] = {"pages": len(self.minify_report), "bytes_before": before, "bytes_after": after,
+                                      "per_page": dict(sorted(self.minify_report.items()))}
+        self.emit('build_end', self.profile)
+        if self.profile_path:
+            with open(self.profile_path, 'w', encoding='utf-8') as f: json.dump(self.profile, f, indent=2)
+            self.log(f"📊 Profile written to {self.profile_path}")
+
+    def run(self):
+        self.log("🚀 Starting VPN Generator V5.0 (SEO & Schema)...")
+        build_start = time.perf_counter()
+        status = "failed"
+        try:
+            with self.stage('prepare'): self.prepare_build_dir()
+            with self.stage('assets'): self.generate_assets()
+            with self.stage('load_data'): vpns = self.load_index_rows()
+            if not vpns:
+                # 只有 CSV 不存在或没有数据行时才发布占位页
+                self.log("⚠️ No VPN data found. Generating placeholder.")
+                self.page_is_current('index.html', None)
+                self.write_file('index.html', "<h1>Coming Soon</h1>")
+                self.remove_orphans()
+                self.precompress_output()
+                self.commit_build()
+                status = "placeholder"
+                return
+            with self.stage('logos'): self.prepare_logos(vpns)
+            with self.stage('generate_index'): self.generate_index(vpns)
+            with self.stage('generate_details'): self.generate_details(self.iter_rows())
+            with self.stage('search_index'): self.generate_search_index()
+            with self.stage('comparisons'): self.generate_comparisons(vpns)
+            with self.stage('generate_legal'): self.generate_legal()
+            if self.post_history:
+                with self.stage('post_history'): self.generate_post_history(vpns)
+            with self.stage('generate_sitemap'): self.generate_sitemap()
+            # 先删孤儿页，再预压缩：etags.json 与 .gz/.br/.zst 只覆盖仍然存在的文件
+            with self.stage('remove_orphans'): self.remove_orphans()
+            with self.stage('precompress'): self.precompress_output()
+            with self.stage('commit'): self.commit_build()
+            status = "ok"
+            self.log(f"✅ Build Complete. ({self.stats['written']} written, {self.stats['skipped']} unchanged, {self.stats['removed']} removed, {self.stats['compressed']} compressed)")
+            if self.failed_pages: self.log(f"⚠️ {len(self.failed_pages)} page(s) failed: {', '.join(slug for slug, _ in self.failed_pages)}")
+            if self.minify: self.log_minify_savings()
+        except Exception as e:
+            # 构建失败时丢弃 staging，线上 output/ 保持上一次的完整版本
+            self.discard_build()
+            self.log(f"❌ BUILD FAILED: {e}")
+        finally:
+            self.finish_profile(status, time.perf_counter() - build_start)
+
+def build_sites(sites_path, **options):
+    # 多站点 / 多语言构建：CSV 只解析一次、logo 只读取一次，各站点在同一进程内并发构建到各自的输出目录
+    # （各自的 manifest、sitemap 与 robots.txt 使用站点自己的 domain）
+    with open(sites_path, 'r', encoding='utf-8') as f: sites = json.load(f)
+    ids = [site.get('id') for site in sites]
+    if not all(ids) or len(set(ids)) != len(ids): raise ValueError(f"{sites_path}: every site needs a unique \"id\"")
+    base = VPNGenerator(**options)
+    base.log(f"🌍 Building {len(sites)} site(s): {', '.join(ids)}")
+    start = time.perf_counter()
+    catalog = list(base.iter_rows())
+    logo_data = {}
+    for domain in dict.fromkeys(base.get_real_domain(vpn.name) for vpn in catalog):
+        logo_data[domain] = base.load_logo(domain)
+    base.log_placeholder_logos()
+    if options.get('post_history'):
+        # 先在主线程 ingest 一次，各站点线程只读 SQLite，避免并发写锁
+        index = MarketingIndex(base_dir=base.base_dir)
+        try: index.ingest()
+        finally: index.close()
+    profile_path = options.pop('profile_path', None)
+    gens = []
+    for site in sites:
+        site_profile = None
+        if profile_path:
+            root, ext = os.path.splitext(profile_path)
+            site_profile = f"{root}-{site['id']}{ext}"
+        gens.append(VPNGenerator(site=site, catalog=catalog, logo_data=logo_data, profile_path=site_profile, **options))
+    with ThreadPoolExecutor(max_workers=len(gens)) as pool:
+        list(pool.map(lambda gen: gen.run(), gens))
+    base.log(f"🌍 {len(gens)} site(s) built in {time.perf_counter() - start:.2f}s: " + ", ".join(f"{gen.site_id} {gen.profile['status']}" for gen in gens))
+    return all(gen.profile['status'] == "ok" for gen in gens)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tiandao VPN static site generator")
+    parser.add_argument('--incremental', action='store_true', help="only re-render pages whose inputs changed since the last build")
+    parser.add_argument('--jobs', '-j', type=int, default=1, help="number of worker processes for detail pages (default: 1)")
+    parser.add_argument('--precompress', action='store_true', help="write .gz (and .br/.zst if available) siblings and an etags.json manifest")
+    parser.add_argument('--inline-critical-css', action='store_true', help="inline above-the-fold CSS on index.html and load style.css asynchronously")
+    parser.add_argument('--minify', action='store_true', help="minify HTML/CSS/JSON-LD as pages are written and normalize Long_Review HTML (per-page savings go into --profile)")
+    parser.add_argument('--profile', nargs='?', const='build-profile.json', metavar='PATH', help="write per-stage timing/bytes/peak RSS as JSON (default: build-profile.json)")
+    parser.add_argument('--post-history', action='store_true', help="index marketing/ post logs and write <provider>-posts.html history pages")
+    parser.add_argument('--no-fetch-logos', dest='fetch_logos', action='store_false', help="offline builds / CI: don't download logos (by default logos missing from data/logos/ are fetched from www.google.com once and cached there, which needs network access); missing logos get a placeholder")
+    parser.add_argument('--watch', action='store_true', help="rebuild only the pages affected by edits to the CSV/config and serve a live-reloading preview")
+    parser.add_argument('--port', type=int, default=8000, help="preview server port for --watch (default: 8000, 0 disables the server)")
+    parser.add_argument('--sites', metavar='PATH', help="JSON list of site configs ({\"id\", \"domain\", \"site_name\", \"affiliate_map\", \"locale\", ...}) built into output-<id>/ from one parsed catalog")
+    args = parser.parse_args()
+    if args.sites and args.watch: parser.error("--sites cannot be combined with --watch")
+    options = dict(incremental=args.incremental or args.watch, jobs=args.jobs, precompress=args.precompress,
+                   logo_fetcher=fetch_google_favicon if args.fetch_logos else None,
+                   inline_critical_css=args.inline_critical_css, profile_path=args.profile,
+                   post_history=args.post_history, minify=args.minify)
+    make_generator = lambda: VPNGenerator(**options)
+    if args.sites:
+        # 任一站点失败时以非零状态退出，cron / CI 才能发现
+        if not build_sites(args.sites, **options): sys.exit(1)
+    elif args.watch:
+        from preview import Watcher
+        Watcher(make_generator, port=args.port).run()
+    else:
+        make_generator().run()
+
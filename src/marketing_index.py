@@ -0,0 +1,182 @@
+import os
+import re
+import sys
+import glob
+import sqlite3
+import hashlib
+import argparse
+import datetime
+
+# Marketing 日志索引：把 marketing/vpn_posts_*.md 解析一次写入 SQLite，
+# 之后「上周给 NordVPN 发了什么」之类的查询不再需要重扫全部日志
+
+POSTS_GLOB = 'vpn_posts_*.md'
+HEADER_RE = re.compile(r'^# Marketing Log (\S+)', re.M)
+FILENAME_EPOCH_RE = re.compile(r'_(\d{13})\.md$')
+REVIEW_URL_RE = re.compile(r'Full Review & Deal:\s*(\S+)')
+URL_RE = re.compile(r'https?://\S+')
+HASHTAG_RE = re.compile(r'#\w+')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    name TEXT PRIMARY KEY,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL,
+    logged_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS posts (
+    id INTEGER PRIMARY KEY,
+    file TEXT NOT NULL REFERENCES files(name),
+    provider TEXT NOT NULL,
+    slug TEXT NOT NULL,
+    posted_at TEXT NOT NULL,
+    body TEXT NOT NULL,
+    review_url TEXT,
+    norm_hash TEXT NOT NULL,
+    duplicate_of INTEGER
+);
+CREATE INDEX IF NOT EXISTS posts_by_slug ON posts (slug, posted_at);
+CREATE INDEX IF NOT EXISTS posts_by_hash ON posts (norm_hash, posted_at);
+CREATE INDEX IF NOT EXISTS posts_by_file ON posts (file);
+"""
+
+def provider_slug(provider):
+    # 与 VPNGenerator.get_review_slug 的规则一致（去掉 -review.html 后缀）
+    return str(provider).strip().lower().replace(' ', '-')
+
+def normalize_post(text):
+    # 近似重复判定：忽略大小写、链接、话题标签、emoji 与标点，只比较剩下的词序列
+    text = URL_RE.sub(' ', text.lower())
+    text = HASHTAG_RE.sub(' ', text)
+    text = re.sub(r'[^\w\s%]', ' ', text)
+    return ' '.join(text.split())
+
+def parse_log(text, fallback_time):
+    # 返回 (logged_at, [(provider, body, review_url), ...])
+    header = HEADER_RE.search(text)
+    logged_at = header.group(1) if header else fallback_time
+    posts = []
+    for section in re.split(r'^## ', text, flags=re.M)[1:]:
+        provider, _, rest = section.partition('\n')
+        body = rest.split('\n---', 1)[0]
+        match = REVIEW_URL_RE.search(body)
+        review_url = match.group(1) if match else None
+        lines = [line for line in body.strip().splitlines() if not REVIEW_URL_RE.search(line)]
+        posts.append((provider.strip(), '\n'.join(lines).strip(), review_url))
+    return logged_at, posts
+
+class MarketingIndex:
+    def __init__(self, base_dir=None, db_path=None):
+        self.base_dir = base_dir or os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        self.marketing_dir = os.path.join(self.base_dir, 'marketing')
+        self.db_path = db_path or os.path.join(self.base_dir, 'data', 'marketing_index.sqlite')
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+
+    def log(self, message):
+        print(f"[MKT-IDX] {message}")
+
+    def close(self):
+        self.conn.close()
+
+    def pending_files(self):
+        # 只处理新增或 mtime/size 变化的日志文件
+        known = {row['name']: (row['mtime'], row['size']) for row in self.conn.execute("SELECT name, mtime, size FROM files")}
+        pending = []
+        for path in glob.glob(os.path.join(self.marketing_dir, POSTS_GLOB)):
+            st = os.stat(path)
+            if known.get(os.path.basename(path)) != (st.st_mtime, st.st_size):
+                pending.append((path, st))
+        return pending
+
+    def file_time(self, path, st):
+        match = FILENAME_EPOCH_RE.search(path)
+        seconds = int(match.group(1)) / 1000 if match else st.st_mtime
+        return datetime.datetime.fromtimestamp(seconds, datetime.timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
+
+    def ingest(self):
+        pending = self.pending_files()
+        if not pending:
+            self.log("✅ Index up to date.")
+            return 0
+        parsed = []
+        for path, st in pending:
+            with open(path, 'r', encoding='utf-8') as f:
+                logged_at, posts = parse_log(f.read(), self.file_time(path, st))
+            parsed.append((logged_at, os.path.basename(path), st, posts))
+        # 按日志时间顺序写入，id 顺序即时间顺序
+        parsed.sort()
+
+        touched, count = set(), 0
+        with self.conn:
+            for logged_at, name, st, posts in parsed:
+                for row in self.conn.execute("SELECT DISTINCT norm_hash FROM posts WHERE file = ?", (name,)):
+                    touched.add(row['norm_hash'])
+                self.conn.execute("DELETE FROM posts WHERE file = ?", (name,))
+                self.conn.execute("INSERT OR REPLACE INTO files (name, mtime, size, logged_at) VALUES (?, ?, ?, ?)",
+                                  (name, st.st_mtime, st.st_size, logged_at))
+                for provider, body, review_url in posts:
+                    norm_hash = hashlib.sha1(normalize_post(body).encode('utf-8')).hexdigest()
+                    slug = os.path.basename(review_url)[:-len('-review.html')] if review_url and review_url.endswith('-review.html') else provider_slug(provider)
+                    self.conn.execute(
+                        "INSERT INTO posts (file, provider, slug, posted_at, body, review_url, norm_hash) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (name, provider, slug, logged_at, body, review_url, norm_hash))
+                    touched.add(norm_hash)
+                    count += 1
+            self.mark_duplicates(touched)
+        self.log(f"✅ Ingested {count} posts from {len(parsed)} file(s).")
+        return count
+
+    def mark_duplicates(self, hashes):
+        # 同一归一化哈希下，最早的帖子为原件，其余指向它
+        for norm_hash in hashes:
+            ids = [row['id'] for row in self.conn.execute("SELECT id FROM posts WHERE norm_hash = ? ORDER BY posted_at, id", (norm_hash,))]
+            if not ids: continue
+            self.conn.execute("UPDATE posts SET duplicate_of = NULL WHERE id = ?", (ids[0],))
+            self.conn.executemany("UPDATE posts SET duplicate_of = ? WHERE id = ?", [(ids[0], i) for i in ids[1:]])
+
+    def history(self, provider=None, slug=None, since=None, until=None):
+        slug = slug or provider_slug(provider)
+        sql, params = "SELECT * FROM posts WHERE slug = ?", [slug]
+        if since:
+            sql += " AND posted_at >= ?"
+            params.append(since)
+        if until:
+            sql += " AND posted_at < ?"
+            params.append(until)
+        return self.conn.execute(sql + " ORDER BY posted_at, id", params).fetchall()
+
+    def duplicate_counts(self):
+        return self.conn.execute(
+            "SELECT provider, COUNT(*) AS total, SUM(duplicate_of IS NOT NULL) AS duplicates "
+            "FROM posts GROUP BY slug ORDER BY duplicates DESC, provider").fetchall()
+
+def main():
+    parser = argparse.ArgumentParser(description="Index marketing/vpn_posts_*.md logs into SQLite")
+    sub = parser.add_subparsers(dest='command')
+    sub.add_parser('ingest', help="parse log files added or changed since the last run")
+    history = sub.add_parser('history', help="list posts for one provider")
+    history.add_argument('provider')
+    history.add_argument('--since', help="ISO date/time, e.g. 2026-01-14")
+    history.add_argument('--until', help="ISO date/time (exclusive)")
+    history.add_argument('--unique', action='store_true', help="hide near-duplicate posts")
+    sub.add_parser('dupes', help="near-duplicate counts per provider")
+    args = parser.parse_args()
+
+    index = MarketingIndex()
+    try:
+        index.ingest()
+        if args.command == 'history':
+            for row in index.history(args.provider, since=args.since, until=args.until):
+                if args.unique and row['duplicate_of']: continue
+                flag = f" (dup of #{row['duplicate_of']})" if row['duplicate_of'] else ""
+                print(f"#{row['id']} {row['posted_at']}{flag}\n{row['body']}\n")
+        elif args.command == 'dupes':
+            for row in index.duplicate_counts():
+                print(f"{row['provider']:<32} {row['total']:>5} posts {row['duplicates']:>5} near-duplicates")
+    finally:
+        index.close()
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,168 @@
+import re
+import json
+import html
+from html.parser import HTMLParser
+
+# 输出阶段压缩（--minify）：每个页面在写盘前单独处理，不缓冲整站。
+# 只做不改变渲染结果的变换：折叠空白、删除块级边界处的空白与注释、压缩 <style> 与 JSON-LD；
+# <pre> / <textarea> / 普通 <script> 原样保留。另外对 CSV 中的 Long_Review 做规范化与清洗
+
+# 规则变化时递增：进入页面的增量哈希，并使评测规范化缓存失效
+MINIFY_VERSION = 2
+
+# 这些标签两侧的空白不影响渲染（块级盒子边界处的空白会被折叠掉）
+BLOCK_TAGS = frozenset("""
+html head body title meta link base div p h1 h2 h3 h4 h5 h6 ul ol li dl dt dd table thead tbody tfoot tr td th caption
+colgroup col header footer nav section article aside main form fieldset legend figure figcaption blockquote hr br
+option optgroup
+""".split())
+RAW_TAGS = ('pre', 'textarea', 'script', 'style')
+STRING_RE = r'"[^"]*"|\'[^\']*\''
+# 属性值可能含 '>'（如 favicon 的 data:image/svg+xml URI），按引号跳过
+TOKEN_RE = re.compile(
+    r'<!--.*?-->'
+    r'|<(' + '|'.join(RAW_TAGS) + r')\b((?:' + STRING_RE + r'|[^\'">])*)>(.*?)</\1\s*>'
+    r'|<[a-zA-Z/!](?:' + STRING_RE + r'|[^\'">])*>',
+    re.S | re.I)
+TAG_NAME_RE = re.compile(r'</?([a-zA-Z][\w-]*)')
+# 只折叠 HTML 空白字符；&nbsp;（U+00A0）不是空白，不能动
+SPACE_RE = re.compile(r'[ \t\n\r\f]+')
+ATTR_SPLIT_RE = re.compile(r'(' + STRING_RE + r')')
+CSS_SPLIT_RE = re.compile(r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')')
+
+def tag_name(tag):
+    match = TAG_NAME_RE.match(tag)
+    return match.group(1).lower() if match else ''
+
+def minify_tag(tag):
+    # 只折叠引号外的空白："<img  src='a b'\n alt=''>" -> "<img src='a b' alt=''>"
+    parts = ATTR_SPLIT_RE.split(tag)
+    for i in range(0, len(parts), 2): parts[i] = SPACE_RE.sub(' ', parts[i]).replace(' >', '>')
+    return ''.join(parts)
+
+def minify_css(css):
+    # 字符串字面量（content: "✅ "）原样保留；': ' 只在声明中出现，选择器里的后代空格不受影响
+    parts = CSS_SPLIT_RE.split(re.sub(r'/\*.*?\*/', '', css, flags=re.S))
+    for i in range(0, len(parts), 2):
+        text = SPACE_RE.sub(' ', parts[i])
+        text = re.sub(r' ?([{};,>]) ?', r'\1', text)
+        parts[i] = text.replace(': ', ':').replace(';}', '}')
+    return ''.join(parts).strip()
+
+def minify_json_ld(text):
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return text
+    # "</" 转义为 "<\/"：JSON 语义不变，且不会提前结束 <script>
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).replace('</', '<\\/')
+
+def minify_raw(raw_tag, attrs, body):
+    open_tag = minify_tag(f"<{raw_tag}{attrs}>")
+    name = raw_tag.lower()
+    if name == 'style': body = minify_css(body)
+    elif name == 'script' and 'application/ld+json' in attrs: body = minify_json_ld(body)
+    return f"{open_tag}{body}</{name}>"
+
+def minify_html(page):
+    # 切成「标签 / 文本」序列；文本中的空白折叠为一个空格，与块级标签相邻的一侧直接去掉
+    tokens = []
+    def add_text(text):
+        # 删掉注释后，两侧的文本合并成一段再折叠空白
+        if tokens and tokens[-1][0] is None: tokens[-1] = (None, tokens[-1][1] + text)
+        elif text: tokens.append((None, text))
+    pos = 0
+    for match in TOKEN_RE.finditer(page):
+        add_text(page[pos:match.start()])
+        token = match.group(0)
+        if token.startswith('<!--'):
+            # 注释不参与渲染；IE 条件注释保留
+            if token.startswith('<!--[if'): tokens.append(('!', token))
+        elif match.group(1):
+            tokens.append((match.group(1).lower(), minify_raw(match.group(1), match.group(2), match.group(3))))
+        elif token.startswith('<!'):
+            tokens.append(('!', token))
+        else:
+            tokens.append((tag_name(token), minify_tag(token)))
+        pos = match.end()
+    add_text(page[pos:])
+
+    out = []
+    for i, (name, token) in enumerate(tokens):
+        if name is not None:
+            out.append(token)
+            continue
+        text = SPACE_RE.sub(' ', token)
+        if i == 0 or tokens[i - 1][0] in BLOCK_TAGS or tokens[i - 1][0] == '!': text = text.lstrip(' ')
+        if i == len(tokens) - 1 or tokens[i + 1][0] in BLOCK_TAGS: text = text.rstrip(' ')
+        if text: out.append(text)
+    return ''.join(out)
+
+# --- Long_Review 规范化 / 清洗 ---
+# 正文中允许出现的标签；其余未知标签去掉标签保留文字，危险标签连同内容一起删除
+REVIEW_TAGS = frozenset("""
+h1 h2 h3 h4 h5 h6 p br wbr hr div span section article header footer aside details summary blockquote ul ol li dl dt dd
+strong b em i u s small mark sub sup code pre kbd samp var dfn abbr cite q time del ins bdi bdo ruby rt rp a img
+figure figcaption table caption colgroup col thead tbody tfoot tr th td
+""".split())
+REVIEW_VOID_TAGS = frozenset(('br', 'wbr', 'hr', 'img', 'col'))
+REVIEW_DROP_TAGS = frozenset(('script', 'style', 'iframe', 'object', 'noscript', 'template', 'svg', 'math'))
+URL_ATTRS = frozenset(('href', 'src', 'cite'))
+# URL 只允许 http / https / mailto 与相对地址。浏览器解析前会去掉 ASCII 空白与控制字符
+# （"java\tscript:" 照样执行），所以先去掉它们再取 scheme
+URL_IGNORED_RE = re.compile(r'[\x00-\x20]+')
+URL_SCHEME_RE = re.compile(r'^([a-zA-Z][a-zA-Z0-9+.-]*):')
+SAFE_URL_SCHEMES = frozenset(('http', 'https', 'mailto'))
+
+def is_safe_url(value):
+    match = URL_SCHEME_RE.match(URL_IGNORED_RE.sub('', value))
+    return not match or match.group(1).lower() in SAFE_URL_SCHEMES
+
+class ReviewSanitizer(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.out, self.stack, self.dropping = [], [], 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in REVIEW_DROP_TAGS:
+            self.dropping += 1
+            return
+        if self.dropping or tag not in REVIEW_TAGS: return
+        kept = []
+        for key, value in attrs:
+            # 事件属性与不在白名单内的链接（javascript: / data: ...）去掉
+            if key.startswith('on') or key == 'srcdoc': continue
+            if key in URL_ATTRS and value and not is_safe_url(value): continue
+            kept.append(f' {key}' if value is None else f' {key}="{html.escape(value)}"')
+        self.out.append(f"<{tag}{''.join(kept)}>")
+        if tag not in REVIEW_VOID_TAGS: self.stack.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        # 与浏览器一致：非空元素上的 "/>" 被忽略，<div/> 等同于 <div>
+        self.handle_starttag(tag, attrs)
+
+    def handle_endtag(self, tag):
+        if tag in REVIEW_DROP_TAGS:
+            self.dropping = max(0, self.dropping - 1)
+            return
+        if self.dropping or tag not in self.stack: return
+        # 补齐中间未闭合的标签，避免正文把页面结构「吃掉」
+        while self.stack:
+            open_tag = self.stack.pop()
+            self.out.append(f"</{open_tag}>")
+            if open_tag == tag: break
+
+    def handle_data(self, data):
+        if self.dropping: return
+        if 'pre' not in self.stack: data = SPACE_RE.sub(' ', data)
+        self.out.append(html.escape(data, quote=False))
+
+    def result(self):
+        self.close()
+        while self.stack: self.out.append(f"</{self.stack.pop()}>")
+        return ''.join(self.out).strip(' ')
+
+def normalize_review(blob):
+    parser = ReviewSanitizer()
+    parser.feed(blob)
+    return parser.result()
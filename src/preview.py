@@ -0,0 +1,103 @@
+import os
+import time
+import functools
+import threading
+import http.server
+
+# --watch：轮询 data/vpn_raw.csv、config.json 与 data/logos/，只重建受编辑影响的页面；
+# 同时用标准库 http.server 提供预览，重建后页面自动刷新（刷新脚本只在响应中注入，不写入 output/）
+
+POLL_INTERVAL = 0.25
+RELOAD_PATH = '/__reload'
+RELOAD_SCRIPT = """<script>(function(){{var id="{build_id}";setInterval(function(){{fetch("{path}",{{cache:"no-store"}}).then(function(r){{return r.text();}}).then(function(t){{if(t!==id)location.reload();}}).catch(function(){{}});}},500);}})();</script>"""
+
+def log(message):
+    print(f"[WATCH] {message}")
+
+class PreviewHandler(http.server.SimpleHTTPRequestHandler):
+    def do_GET(self):
+        route = self.path.split('?', 1)[0]
+        if route == RELOAD_PATH:
+            return self.send_bytes(str(self.server.build_id).encode('utf-8'), 'text/plain; charset=utf-8')
+        path = self.translate_path(route)
+        if os.path.isdir(path) and route.endswith('/'): path = os.path.join(path, 'index.html')
+        if path.endswith('.html') and os.path.isfile(path):
+            with open(path, 'rb') as f: html = f.read()
+            script = RELOAD_SCRIPT.format(build_id=self.server.build_id, path=RELOAD_PATH).encode('utf-8')
+            if b'</body>' in html: html = html.replace(b'</body>', script + b'</body>', 1)
+            else: html += script
+            return self.send_bytes(html, 'text/html; charset=utf-8')
+        return super().do_GET()
+
+    def send_bytes(self, body, content_type):
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def start_preview(directory, port):
+    # output/ 在完整构建时会被整体 rename 替换；handler 每次请求按路径解析，因此始终读到最新站点
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', port), functools.partial(PreviewHandler, directory=directory))
+    server.build_id = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+class Watcher:
+    def __init__(self, make_generator, port=8000):
+        # make_generator() 每次返回一个新的 VPNGenerator（重新读取 config），保证各次重建互不影响
+        self.make_generator = make_generator
+        self.port = port
+        self.server = None
+
+    def stamp(self, gen):
+        stamps = []
+        for path in (gen.data_path, gen.config_path, gen.logo_cache_dir):
+            try:
+                st = os.stat(path)
+                stamps.append((st.st_mtime_ns, st.st_size))
+            except OSError:
+                stamps.append(None)
+        return tuple(stamps)
+
+    def run(self):
+        gen = self.make_generator()
+        gen.run()
+        rows, stamp = gen.catalog_snapshot(), self.stamp(gen)
+        if self.port:
+            self.server = start_preview(gen.output_dir, self.port)
+            log(f"🌐 Preview at http://127.0.0.1:{self.server.server_address[1]}/")
+        log(f"👀 Watching {os.path.relpath(gen.data_path, gen.base_dir)}, {os.path.relpath(gen.config_path, gen.base_dir)} and {os.path.relpath(gen.logo_cache_dir, gen.base_dir)}/ (Ctrl+C to stop)")
+        try:
+            while True:
+                time.sleep(POLL_INTERVAL)
+                current = self.stamp(gen)
+                if current == stamp: continue
+                # 编辑器保存可能分几次写入：等到连续两次轮询结果一致再重建
+                time.sleep(POLL_INTERVAL)
+                if self.stamp(gen) != current: continue
+                gen, rows = self.rebuild(gen, rows, logos_changed=current[2] != stamp[2])
+                stamp = current
+        except KeyboardInterrupt:
+            log("👋 Stopped.")
+        finally:
+            if self.server: self.server.shutdown()
+
+    def rebuild(self, previous, old_rows, logos_changed=False):
+        gen = self.make_generator()
+        try:
+            rows = gen.catalog_snapshot()
+        except Exception as e:
+            log(f"❌ Could not read catalog, keeping the current site: {e}")
+            return previous, old_rows
+        plan = None if logos_changed or not rows else gen.plan_rebuild(previous.config, old_rows, rows)
+        if plan is None:
+            gen.run()
+        else:
+            gen.run_partial(*plan)
+        if self.server: self.server.build_id += 1
+        return gen, rows
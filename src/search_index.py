@@ -0,0 +1,83 @@
+import re
+import html
+import json
+import heapq
+import collections
+
+# 构建期全文检索：把 Provider 的名称、lsi_keywords、pros/cons 与去标签后的 Long_Review 分词，
+# 生成「词 -> [文档号, 分数, ...]」倒排表，按词前缀切成不超过 max_bytes 的 JSON 分片，前端只取用到的分片
+
+# 分词 / 打分规则变化时递增，使构建缓存失效
+SEARCH_INDEX_VERSION = 1
+TAG_RE = re.compile(r'<[^>]+>')
+TOKEN_RE = re.compile(r'\w+')
+# 字段权重：名称与关键词命中比正文命中重要得多
+FIELD_WEIGHTS = (('name', 8), ('lsi_keywords', 4), ('best_for', 3), ('pros', 2), ('cons', 2), ('long_review', 1))
+# 每个文档只保留分数最高的若干词，每个词只保留分数最高的若干文档，保证索引与分片体积可控
+MAX_TERMS_PER_DOC = 100
+MAX_POSTINGS_PER_TERM = 1000
+STOPWORDS = frozenset("""
+a about after all also an and any are as at be because been but by can could do does for from has have how if in
+into is it its just more most no not of on one only or our out over so some such than that the their them then there
+these they this to up us very was we were what when which while who will with without you your
+""".split())
+
+def tokenize(text):
+    # 前端对查询做同样的处理：小写、按 \w 切词、去掉单字符与停用词
+    return [t for t in TOKEN_RE.findall(html.unescape(TAG_RE.sub(' ', text)).lower()) if len(t) > 1 and t not in STOPWORDS]
+
+def searchable_fields(vpn):
+    # 参与索引的字段（也是增量判断的依据）
+    return (vpn.name, vpn.lsi_keywords, vpn.best_for, vpn.pros, vpn.cons, vpn.long_review)
+
+def provider_terms(vpn):
+    # 返回 [(term, score), ...]，score 为按字段加权的词频
+    scores = collections.Counter()
+    for field, weight in FIELD_WEIGHTS:
+        value = getattr(vpn, field)
+        for token in tokenize(' '.join(value) if isinstance(value, tuple) else value):
+            scores[token] += weight
+    return heapq.nlargest(MAX_TERMS_PER_DOC, scores.items(), key=lambda item: (item[1], item[0]))
+
+def build_postings(doc_terms):
+    # doc_terms: 文档号顺序的 [(term, score), ...] 列表
+    postings = collections.defaultdict(list)
+    for doc_id, terms in enumerate(doc_terms):
+        for term, score in terms:
+            postings[term].append((score, doc_id))
+    index = {}
+    for term, entries in postings.items():
+        if len(entries) > MAX_POSTINGS_PER_TERM:
+            entries = heapq.nlargest(MAX_POSTINGS_PER_TERM, entries, key=lambda entry: (entry[0], -entry[1]))
+        # 扁平数组 [doc, score, doc, score, ...]，按文档号排序
+        index[term] = [value for score, doc_id in sorted(entries, key=lambda entry: entry[1]) for value in (doc_id, score)]
+    return index
+
+def encode(obj):
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':'), sort_keys=True)
+
+def shard_index(index, max_bytes):
+    # 从空前缀开始：整组超过 max_bytes 就按多一位前缀拆分，直到放得下（单个词过大时无法再拆，独占一个分片）；
+    # 之后把相邻的小组合并进同一个分片。返回 [(前缀列表, {term: postings}), ...]
+    groups = []
+    def split(terms, depth):
+        size = len(encode({term: index[term] for term in terms}).encode('utf-8'))
+        if size <= max_bytes or all(len(term) <= depth for term in terms):
+            groups.append((terms[0][:depth], terms, size))
+            return
+        by_prefix = collections.OrderedDict()
+        for term in terms: by_prefix.setdefault(term[:depth + 1], []).append(term)
+        for prefix_terms in by_prefix.values(): split(prefix_terms, depth + 1)
+    terms = sorted(index)
+    if terms: split(terms, 0)
+
+    shards, prefixes, current, current_size = [], [], {}, 2
+    for prefix, group_terms, size in groups:
+        if current and current_size + size > max_bytes:
+            shards.append((prefixes, current))
+            prefixes, current, current_size = [], {}, 2
+        prefixes.append(prefix)
+        current.update((term, index[term]) for term in group_terms)
+        current_size += size
+    if current: shards.append((prefixes, current))
+    return shards
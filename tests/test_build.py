@@ -0,0 +1,65 @@
+import io
+import os
+import sys
+import pickle
+import shutil
+import tempfile
+import unittest
+import contextlib
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(REPO_DIR, 'src'))
+
+from generator import VPNGenerator
+
+def read_tree(root):
+    files = {}
+    for dirpath, _, names in os.walk(root):
+        for name in names:
+            path = os.path.join(dirpath, name)
+            with open(path, 'rb') as f: files[os.path.relpath(path, root)] = f.read()
+    return files
+
+class ParallelBuildTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def build(self, name, jobs, minify=False):
+        # 每次构建使用独立的 base_dir：CSV / config 从仓库复制，logo 由 stub fetcher 提供（不访问网络）
+        base_dir = os.path.join(self.tmp, name)
+        os.makedirs(os.path.join(base_dir, 'data'))
+        shutil.copy(os.path.join(REPO_DIR, 'data', 'vpn_raw.csv'), os.path.join(base_dir, 'data', 'vpn_raw.csv'))
+        shutil.copy(os.path.join(REPO_DIR, 'config.json'), os.path.join(base_dir, 'config.json'))
+        events = []
+        gen = VPNGenerator(jobs=jobs, minify=minify, base_dir=base_dir, logo_fetcher=lambda domain: (f'<svg>{domain}</svg>'.encode(), '.svg'))
+        gen.add_hook(lambda event, data: events.append(event))
+        with contextlib.redirect_stdout(io.StringIO()): gen.run()
+        self.assertEqual(gen.profile['status'], "ok")
+        self.assertEqual(events[-1], 'build_end')
+        files = read_tree(os.path.join(base_dir, 'output'))
+        # 清单与 sitemap 含构建时间
+        for name in list(files):
+            if name == '.build-manifest.json' or name.startswith('sitemap'): del files[name]
+        return files
+
+    def test_jobs_with_hook_and_fetcher_matches_serial_build(self):
+        serial, parallel = self.build('serial', 1), self.build('parallel', 2)
+        self.assertTrue(any(name.endswith('-review.html') for name in serial))
+        self.assertEqual(sorted(serial), sorted(parallel))
+        for name in serial: self.assertEqual(serial[name], parallel[name], name)
+
+    def test_minify_normalizes_reviews_in_workers(self):
+        # --minify --jobs：Long_Review 在子进程中规范化，结果回传主进程写入缓存
+        serial, parallel = self.build('serial', 1, minify=True), self.build('parallel', 2, minify=True)
+        self.assertEqual(serial, parallel)
+        caches = []
+        for name in ('serial', 'parallel'):
+            with open(os.path.join(self.tmp, name, 'data', 'review-cache.pickle'), 'rb') as f: caches.append(pickle.load(f)['reviews'])
+        self.assertTrue(caches[0])
+        self.assertEqual(caches[0], caches[1])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from minify import minify_html, normalize_review
+
+class NormalizeReviewTest(unittest.TestCase):
+    def test_strips_script_urls_hidden_by_whitespace(self):
+        # 浏览器会去掉 URL 中的制表符 / 换行，"java\tscript:" 仍然可以执行
+        for href in ('java&#x09;script:alert(1)', 'java\nscript:alert(1)', ' \x01javascript:alert(1)',
+                     'JaVaScRiPt:alert(1)', 'vbscript:msgbox(1)', 'data:text/html,<script>alert(1)</script>'):
+            self.assertEqual(normalize_review(f'<a href="{href}">x</a>'), '<a>x</a>', href)
+
+    def test_keeps_safe_urls(self):
+        for href in ('https://example.com/a?b=1', 'http://example.com', 'mailto:team@example.com', 'nordvpn-review.html', '/static/x.png', '#top'):
+            self.assertEqual(normalize_review(f'<a href="{href}">x</a>'), f'<a href="{href}">x</a>', href)
+
+    def test_drops_event_handlers_and_script_content(self):
+        self.assertEqual(normalize_review('<p onclick="steal()">ok<script>alert(1)</script></p>'), '<p>ok</p>')
+
+    def test_keeps_legitimate_markup(self):
+        for blob in ('<h1>Big</h1>', '<h3>Intro</h3><p>Fast <strong>and</strong> safe.</p>', '<header><time>2026</time></header>',
+                     '<table><thead><tr><th>A</th></tr></thead><tbody><tr><td>1</td></tr></tbody></table>'):
+            self.assertEqual(normalize_review(blob), blob)
+
+    def test_balances_unclosed_tags(self):
+        self.assertEqual(normalize_review('<p>a <b>b'), '<p>a <b>b</b></p>')
+
+class MinifyHtmlTest(unittest.TestCase):
+    def test_collapses_whitespace_but_keeps_inline_spacing(self):
+        self.assertEqual(minify_html('<div>\n    <a href="/">Home</a> <span>/</span>   Reviews\n</div>'),
+                         '<div><a href="/">Home</a> <span>/</span> Reviews</div>')
+
+    def test_preserves_pre_and_nbsp(self):
+        self.assertEqual(minify_html('<pre>  a\n  b </pre>\n<p>a&nbsp; b\xa0 c</p>'), '<pre>  a\n  b </pre><p>a&nbsp; b\xa0 c</p>')
+
+    def test_compacts_json_ld(self):
+        self.assertEqual(minify_html('<script type="application/ld+json">{"a": "</script"}</script>'),
+                         '<script type="application/ld+json">{"a":"<\\/script"}</script>')
+
+if __name__ == "__main__":
+    unittest.main()